@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark of ConnectionPool checkout latency against a fake DB-API driver
+"""
+import time
+from typing import List
+
+from filtered_logger import ConnectionPool
+
+CHECKOUTS = 1000
+HANDSHAKE = 0.002
+
+
+class FakeCursor:
+    """ DB-API cursor of a FakeConnection
+    """
+
+    def __init__(self, conn: "FakeConnection"):
+        self.conn = conn
+
+    def execute(self, query: str) -> None:
+        """ Fail once the connection is closed or broken
+        """
+        if self.conn.closed or self.conn.broken:
+            raise OSError("connection lost")
+
+    def fetchall(self) -> List[tuple]:
+        """ Return a single row
+        """
+        return [(1,)]
+
+    def close(self) -> None:
+        """ Nothing to release
+        """
+
+
+class FakeConnection:
+    """ DB-API connection paying a simulated TCP/auth handshake
+    """
+
+    opened = 0
+
+    def __init__(self):
+        time.sleep(HANDSHAKE)
+        FakeConnection.opened += 1
+        self.closed = False
+        self.broken = False
+
+    def cursor(self) -> FakeCursor:
+        """ Return a new cursor
+        """
+        return FakeCursor(self)
+
+    def drop(self) -> None:
+        """ Simulate the server dropping the connection
+        """
+        self.broken = True
+
+    def close(self) -> None:
+        """ Close the connection
+        """
+        self.closed = True
+
+
+def per_checkout(func) -> float:
+    """
+    Returns the average microseconds taken by func over CHECKOUTS calls
+    """
+    start = time.perf_counter()
+    for _ in range(CHECKOUTS):
+        func()
+    return (time.perf_counter() - start) / CHECKOUTS * 1e6
+
+
+if __name__ == "__main__":
+    print("new connection: {:.0f}us".format(
+        per_checkout(lambda: FakeConnection().close())))
+
+    pool = ConnectionPool(FakeConnection, size=4)
+    FakeConnection.opened = 0
+
+    def borrow():
+        """ Check a connection out and give it back """
+        with pool.checkout():
+            pass
+
+    print("pool checkout: {:.0f}us, {} connections opened".format(
+        per_checkout(borrow), FakeConnection.opened))
+
+    with pool.checkout() as conn:
+        conn.drop()
+    with pool.checkout() as conn:
+        assert not conn.broken
+    print("broken connection replaced on borrow, {} opened".format(
+        FakeConnection.opened))
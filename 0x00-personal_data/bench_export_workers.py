@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark of export_users_parallel throughput for each worker count
+"""
+import os
+import sqlite3
+import time
+
+from filtered_logger import export_users_parallel
+
+ROWS = 200000
+
+
+class NullStream:
+    """ Stream discarding everything written to it
+    """
+
+    def write(self, data: str) -> None:
+        """ Discard data
+        """
+
+    def flush(self) -> None:
+        """ Nothing to flush
+        """
+
+
+def make_db() -> sqlite3.Connection:
+    """
+    Returns an in-memory database holding ROWS users
+    """
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE users (name, email, phone, ssn, password, ip, "
+               "last_login, user_agent)")
+    db.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                   (("user{}".format(i), "user{}@mail.com".format(i),
+                     "555-0100", "123-45-6789", "hunter2", "10.0.0.1",
+                     "2019-11-14 06:16:24", "Mozilla/5.0")
+                    for i in range(ROWS)))
+    return db
+
+
+if __name__ == "__main__":
+    db = make_db()
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        export_users_parallel(db.cursor(), workers, 2000, NullStream())
+        seconds = time.perf_counter() - start
+        print("{:>2} workers: {:.0f} rows/s".format(workers, ROWS / seconds))
+        workers *= 2
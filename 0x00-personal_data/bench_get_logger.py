@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Benchmark showing the per-message cost stays flat across get_logger calls
+"""
+import io
+import timeit
+
+from filtered_logger import get_logger
+
+MESSAGES = 10000
+
+
+if __name__ == "__main__":
+    stream = io.StringIO()
+    for calls in (1, 10, 100):
+        for _ in range(calls):
+            logger = get_logger(stream=stream)
+        assert len(logger.handlers) == 1
+        seconds = timeit.timeit(lambda: logger.info("name=bob; ip=10.0.0.1;"),
+                                number=MESSAGES)
+        print("{:>3} get_logger calls: {:.2f}us per message".format(
+            calls, seconds / MESSAGES * 1e6))
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Benchmark of hash_passwords throughput for each cost and worker count
+"""
+import os
+import time
+
+from encrypt_password import hash_passwords
+
+PASSWORDS = ["password{}".format(i) for i in range(64)]
+
+
+if __name__ == "__main__":
+    for rounds in (4, 8, 10, 12):
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            start = time.perf_counter()
+            hash_passwords(PASSWORDS, rounds, workers)
+            seconds = time.perf_counter() - start
+            print("cost {:>2}, {:>2} workers: {:.1f} hashes/s".format(
+                rounds, workers, len(PASSWORDS) / seconds))
+            workers *= 2
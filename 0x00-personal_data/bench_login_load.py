@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark of cheap request latency during a login storm, with password
+checks run inline and offloaded to a bounded PasswordVerifier
+"""
+import json
+import statistics
+import threading
+import time
+from typing import Callable, List
+
+from encrypt_password import (PasswordVerifier, VerifierSaturated,
+                              hash_password, is_valid)
+
+LOGIN_THREADS = 32
+DURATION = 3.0
+HASHED = hash_password("H0lbertonSchool98!", 10)
+
+
+def cheap_request() -> None:
+    """ Stand-in for an endpoint that never checks a password
+    """
+    json.dumps({"status": "OK", "users": list(range(100))})
+
+
+def storm(login: Callable[[], None]) -> List[float]:
+    """
+    Runs LOGIN_THREADS threads calling login while measuring the latency
+    of cheap requests, and returns those latencies in milliseconds.
+    """
+    stop = threading.Event()
+
+    def login_loop():
+        """ Log in until stopped """
+        while not stop.is_set():
+            login()
+
+    threads = [threading.Thread(target=login_loop)
+               for _ in range(LOGIN_THREADS)]
+    for thread in threads:
+        thread.start()
+    latencies = []
+    deadline = time.monotonic() + DURATION
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        cheap_request()
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.001)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def report(name: str, latencies: List[float], served: int,
+           rejected: int) -> None:
+    """ Print latency percentiles of the cheap requests
+    """
+    cuts = statistics.quantiles(latencies, n=100)
+    print("{:<8} p50 {:.3f}ms p95 {:.3f}ms p99 {:.3f}ms, "
+          "{} logins served, {} rejected".format(
+              name, cuts[49], cuts[94], cuts[98], served, rejected))
+
+
+if __name__ == "__main__":
+    counts = {"served": 0, "rejected": 0}
+
+    def inline_login():
+        """ Check the password on the request thread """
+        is_valid(HASHED, "H0lbertonSchool98!")
+        counts["served"] += 1
+
+    report("inline", storm(inline_login), counts["served"], 0)
+
+    verifier = PasswordVerifier(workers=2, max_pending=4)
+    counts = {"served": 0, "rejected": 0}
+
+    def offloaded_login():
+        """ Check the password on the verifier, 503 when saturated """
+        try:
+            verifier.verify(HASHED, "H0lbertonSchool98!")
+            counts["served"] += 1
+        except VerifierSaturated:
+            counts["rejected"] += 1
+            time.sleep(0.01)
+
+    report("offload", storm(offloaded_login), counts["served"],
+           counts["rejected"])
+    verifier.shutdown()
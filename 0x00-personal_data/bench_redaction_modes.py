@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the regex and split redaction modes over a range of field counts,
+after checking that both modes redact lines shaped like main()'s the same way
+"""
+import logging
+import random
+import timeit
+
+from filtered_logger import PII_FIELDS, RedactingFormatter
+
+LINES = 100000
+KEYS = PII_FIELDS + ("ip", "last_login", "user_agent", "field1")
+VALUE_CHARS = "abcdef0123456789 @.-:/()"
+
+
+def check_modes(fields, lines: int = 20000):
+    """
+    Asserts both modes format the same output on random lines shaped like
+    the ones main() logs: `key=value;` pairs separated by spaces
+    """
+    formatters = [RedactingFormatter(fields=list(fields), mode=mode)
+                  for mode in RedactingFormatter.MODES]
+    rand = random.Random(0)
+    for _ in range(lines):
+        message = " ".join("{}={};".format(
+            rand.choice(KEYS), "".join(rand.choice(VALUE_CHARS)
+                                       for _ in range(rand.randint(0, 12))))
+            for _ in range(rand.randint(1, 10)))
+        record = logging.LogRecord("user_data", logging.INFO, None, None,
+                                   message, None, None)
+        outputs = [formatter.format(record) for formatter in formatters]
+        assert outputs[0] == outputs[1], outputs
+
+
+def make_record(keys: int) -> logging.LogRecord:
+    """
+    Returns a record whose message holds the given number of key=value pairs
+    """
+    message = " ".join("field{}=value{};".format(i, i) for i in range(keys))
+    return logging.LogRecord("user_data", logging.INFO, None, None,
+                             message, None, None)
+
+
+if __name__ == "__main__":
+    check_modes(PII_FIELDS)
+    check_modes(("name", "ip", "field1"))
+    record = make_record(64)
+    for count in (1, 5, 16, 64):
+        fields = ["field{}".format(i) for i in range(0, 64, 64 // count)]
+        timings = {}
+        outputs = set()
+        for mode in RedactingFormatter.MODES:
+            formatter = RedactingFormatter(fields=fields, mode=mode)
+            outputs.add(formatter.redact(record.getMessage()))
+            timings[mode] = timeit.timeit(
+                lambda: formatter.format(record), number=LINES)
+        assert len(outputs) == 1
+        print("{:>2} fields: ".format(count) + ", ".join(
+            "{} {:.0f} lines/s".format(mode, LINES / seconds)
+            for mode, seconds in timings.items()))
@@ -3,25 +3,144 @@
 Password hashing and validation module
 """
 
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List
+
 import bcrypt
 
-def hash_password(password: str) -> bytes:
+DEFAULT_ROUNDS = 12
+
+
+def hash_password(password: str, rounds: int = DEFAULT_ROUNDS) -> bytes:
     """
     Hashes a password using bcrypt and returns the hashed password as a byte string.
-    
+
     Arguments:
     password -- the password to hash
+    rounds -- the bcrypt cost factor, each extra round doubles the work
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds)
     hashed_password = bcrypt.hashpw(password.encode(), salt)
     return hashed_password
 
+
+def hash_passwords(passwords: Iterable[str], rounds: int = DEFAULT_ROUNDS,
+                   workers: int = None) -> List[bytes]:
+    """
+    Hashes many passwords on a pool of worker processes and returns the
+    hashed passwords in the same order.
+
+    Arguments:
+    passwords -- the passwords to hash
+    rounds -- the bcrypt cost factor
+    workers -- the number of worker processes, one per CPU by default
+    """
+    passwords = list(passwords)
+    if workers == 1 or len(passwords) < 2:
+        return [hash_password(password, rounds) for password in passwords]
+    workers = workers or os.cpu_count() or 1
+    # Each hash takes far longer than sending it to a worker, so chunks
+    # stay small enough to give every worker about four of them
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(hash_password, passwords,
+                                 [rounds] * len(passwords),
+                                 chunksize=chunksize))
+
+
+def hash_rounds(hashed_password: bytes) -> int:
+    """
+    Returns the cost factor a bcrypt hash was computed with.
+
+    Arguments:
+    hashed_password -- a hash of the form $2b$<rounds>$<salt and digest>
+    """
+    return int(hashed_password.split(b"$")[2])
+
+
+def needs_rehash(hashed_password: bytes,
+                 rounds: int = DEFAULT_ROUNDS) -> bool:
+    """
+    Returns True if a stored hash uses a lower cost than rounds, in which
+    case it should be replaced after the next successful login.
+
+    Arguments:
+    hashed_password -- the stored hashed password
+    rounds -- the cost factor hashes are expected to use
+    """
+    return hash_rounds(hashed_password) < rounds
+
+
 def is_valid(hashed_password: bytes, password: str) -> bool:
     """
     Validates a password against a given hashed password.
-    
+
     Arguments:
     hashed_password -- the hashed password to validate against
     password -- the password to validate
     """
     return bcrypt.checkpw(password.encode(), hashed_password)
+
+
+class VerifierSaturated(Exception):
+    """ Raised when too many password verifications are already pending
+    """
+
+
+class PasswordVerifier:
+    """ Runs bcrypt verifications on a bounded pool of threads
+
+    bcrypt releases the GIL while hashing, so the checks run in parallel
+    while the callers wait. Once max_pending checks are queued or running,
+    new ones are rejected immediately instead of piling up.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 32):
+        """
+        Arguments:
+        workers -- the number of verification threads
+        max_pending -- the maximum number of queued and running checks
+        """
+        self._executor = ThreadPoolExecutor(workers,
+                                            thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, hashed_password: bytes, password: str) -> Future:
+        """
+        Schedules a verification and returns its future, or raises
+        VerifierSaturated if max_pending checks are already pending.
+
+        Arguments:
+        hashed_password -- the hashed password to validate against
+        password -- the password to validate
+        """
+        if not self._slots.acquire(blocking=False):
+            raise VerifierSaturated("Too many pending password checks")
+        try:
+            future = self._executor.submit(is_valid, hashed_password,
+                                           password)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def verify(self, hashed_password: bytes, password: str,
+               timeout: float = None) -> bool:
+        """
+        Validates a password on the pool and waits for the result.
+
+        Arguments:
+        hashed_password -- the hashed password to validate against
+        password -- the password to validate
+        timeout -- the maximum number of seconds to wait
+        """
+        return self.submit(hashed_password, password).result(timeout)
+
+    def shutdown(self) -> None:
+        """
+        Waits for the pending checks and stops the threads.
+        """
+        self._executor.shutdown(wait=True)
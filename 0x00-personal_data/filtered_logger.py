@@ -5,13 +5,80 @@ Filtered logger module
 
 import re
 import os
+import json
+import sys
+import argparse
 import logging
-from typing import List
+import queue
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from logging.handlers import QueueHandler, QueueListener
+from typing import (Any, Callable, Dict, FrozenSet, Iterator, List, Mapping,
+                    Pattern, Sequence, Tuple)
 import mysql.connector
 from mysql.connector import connection
 
 PII_FIELDS = ("name", "email", "phone", "ssn", "password")
 
+
+class RedactionEngine:
+    """ Redacts fields from log lines using compiled, cached patterns
+    """
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Arguments:
+        maxsize -- the number of (fields, separator) patterns to keep compiled
+        """
+        self.maxsize = maxsize
+        self._compile = lru_cache(maxsize=maxsize)(self._compile_pattern)
+
+    @staticmethod
+    def _compile_pattern(fields: Tuple[str, ...], separator: str) -> Pattern:
+        """
+        Compiles a pattern matching every `field=value` pair of the given
+        fields, with the field captured so template() can write it back.
+        Matches are found left to right and never overlap, as with a
+        pattern rebuilt from the fields on every call.
+        """
+        alternation = '|'.join(re.escape(field) for field in fields)
+        return re.compile(
+            '({})=[^{}]*'.format(alternation, re.escape(separator)))
+
+    def pattern(self, fields: Sequence[str], separator: str) -> Pattern:
+        """
+        Returns the compiled pattern for the given fields and separator,
+        compiling it on first use and evicting the least recently used one.
+        """
+        return self._compile(tuple(fields), separator)
+
+    @staticmethod
+    def template(redaction: str) -> str:
+        """
+        Returns the replacement template substituting a field value with
+        the redaction string, keeping the field and its '='.
+        """
+        return r'\g<1>=' + redaction.replace('\\', r'\\')
+
+    def redact(self, fields: Sequence[str], redaction: str, message: str,
+               separator: str) -> str:
+        """
+        Returns the message with the values of the given fields redacted.
+        """
+        if not fields:
+            return message
+        return self.pattern(fields, separator).sub(
+            self.template(redaction), message)
+
+
+REDACTION_ENGINE = RedactionEngine()
+
+
 def filter_datum(fields: List[str], redaction: str, message: str, separator: str) -> str:
     """
     Returns the log message obfuscated.
@@ -22,8 +89,35 @@ def filter_datum(fields: List[str], redaction: str, message: str, separator: str
     message -- a string representing the log line
     separator -- a string representing by which character is separating all fields in the log line (message)
     """
-    pattern = '|'.join([f'{field}=[^{separator}]*' for field in fields])
-    return re.sub(pattern, lambda m: f"{m.group(0).split('=')[0]}={redaction}", message)
+    return REDACTION_ENGINE.redact(fields, redaction, message, separator)
+
+
+def split_datum(fields: FrozenSet[str], redaction: str, message: str,
+                separator: str) -> str:
+    """
+    Returns the log message obfuscated in a single pass over its fields.
+
+    The message is split on the separator once and every `key=value`
+    token whose key is in fields gets its value replaced. The key is the
+    last space-delimited word before the first '=' of the token.
+
+    The output matches filter_datum for lines shaped like the ones main()
+    logs: `key=value;` pairs separated by spaces, whose values contain
+    neither the separator nor another `field=`. Other lines, such as
+    "username=bob;", are only redacted by filter_datum.
+
+    Arguments:
+    fields -- a frozenset of all field names to obfuscate
+    redaction -- a string representing by what the field will be obfuscated
+    message -- a string representing the log line
+    separator -- a string representing by which character is separating all fields in the log line (message)
+    """
+    tokens = message.split(separator)
+    for i, token in enumerate(tokens):
+        key, eq, _ = token.partition('=')
+        if eq and key.rpartition(' ')[2] in fields:
+            tokens[i] = key + eq + redaction
+    return separator.join(tokens)
 
 
 class RedactingFormatter(logging.Formatter):
@@ -33,43 +127,497 @@ class RedactingFormatter(logging.Formatter):
     REDACTION = "***"
     FORMAT = "[HOLBERTON] %(name)s %(levelname)s %(asctime)-15s: %(message)s"
     SEPARATOR = ";"
+    MODES = ("regex", "split")
 
-    def __init__(self, fields: List[str]):
+    def __init__(self, fields: List[str], mode: str = "regex"):
+        """
+        Arguments:
+        fields -- the fields to obfuscate
+        mode -- "regex" to redact with a compiled pattern, or "split" to
+        redact by splitting on SEPARATOR and looking keys up in a frozenset,
+        which only pays off with many fields and gives the same output on
+        lines shaped like the ones main() logs (see split_datum)
+        """
+        if mode not in self.MODES:
+            raise ValueError("Unknown redaction mode: {}".format(mode))
         super(RedactingFormatter, self).__init__(self.FORMAT)
         self.fields = fields
+        self.mode = mode
+        self._pattern = None
+        self._template = RedactionEngine.template(self.REDACTION)
+        self._field_set = frozenset(fields or ())
+        if fields and mode == "regex":
+            self._pattern = REDACTION_ENGINE.pattern(fields, self.SEPARATOR)
+
+    def redact(self, message: str) -> str:
+        """
+        Obfuscate sensitive information in an already formatted message.
+        """
+        if not self._field_set:
+            return message
+        if self._pattern is None:
+            return split_datum(self._field_set, self.REDACTION, message,
+                               self.SEPARATOR)
+        return self._pattern.sub(self._template, message)
+
+    def redact_fields(self, fields: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Returns a copy of a mapping with the values of sensitive keys
+        replaced by REDACTION.
+        """
+        field_set = self._field_set
+        return {key: self.REDACTION if key in field_set else value
+                for key, value in fields.items()}
+
+    def render_fields(self, fields: Mapping[str, Any]) -> str:
+        """
+        Returns the `key=value;` message of a mapping, redacting the
+        values of sensitive keys while rendering.
+        """
+        field_set = self._field_set
+        redaction = self.REDACTION
+        return " ".join([
+            f"{key}={redaction};" if key in field_set else f"{key}={value};"
+            for key, value in fields.items()])
 
     def format(self, record: logging.LogRecord) -> str:
         """
         Format the log record and obfuscate sensitive information.
+        Records logged with a mapping as message are redacted by key while
+        rendered, without scanning the formatted line again.
+        """
+        if not isinstance(record.msg, Mapping):
+            original_message = super(RedactingFormatter, self).format(record)
+            return self.redact(original_message)
+        record.message = self.render_fields(record.msg)
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        formatted = self.formatMessage(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            formatted += "\n" + record.exc_text
+        if record.stack_info:
+            formatted += "\n" + self.formatStack(record.stack_info)
+        return formatted
+
+
+class JsonRedactingFormatter(RedactingFormatter):
+    """ Redacting Formatter emitting one JSON object per line
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format the log record as JSON and obfuscate sensitive information.
+        Mapping messages are redacted by key and emitted under "fields".
         """
-        original_message = super(RedactingFormatter, self).format(record)
-        return filter_datum(self.fields, self.REDACTION, original_message, self.SEPARATOR)
+        line = {
+            "logger": record.name,
+            "level": record.levelname,
+            "time": self.formatTime(record, self.datefmt),
+        }
+        if isinstance(record.msg, Mapping):
+            line["fields"] = self.redact_fields(record.msg)
+        else:
+            line["message"] = self.redact(record.getMessage())
+        if record.exc_info:
+            line["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(line, default=str)
 
 
-def get_logger() -> logging.Logger:
+_HANDLERS = {}
+_HANDLERS_LOCK = threading.Lock()
+
+
+def _install_handler(handler: logging.Handler, level: int) -> logging.Logger:
     """
-    Creates and returns a logger with a RedactingFormatter.
+    Makes handler the only handler of the user_data logger.
+
+    The handler list is replaced in a single assignment, so records logged
+    concurrently go either to the previous handlers or to the new one,
+    never to both. Replaced queue handlers are closed to stop their worker.
     """
     logger = logging.getLogger("user_data")
-    logger.setLevel(logging.INFO)
     logger.propagate = False
-    stream_handler = logging.StreamHandler()
-    formatter = RedactingFormatter(fields=PII_FIELDS)
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+    if logger.handlers == [handler] and logger.level == level:
+        return logger
+    previous = logger.handlers
+    logger.handlers = [handler]
+    logger.setLevel(level)
+    for old_handler in previous:
+        if old_handler is not handler and \
+                isinstance(old_handler, RedactingQueueHandler):
+            old_handler.close()
     return logger
 
 
-def get_db() -> connection.MySQLConnection:
+def get_logger(fields: Sequence[str] = PII_FIELDS, level: int = logging.INFO,
+               stream=None) -> logging.Logger:
+    """
+    Returns the user_data logger with a RedactingFormatter.
+
+    Handlers and formatters are built once per (fields, level, stream)
+    configuration and reused, so calling it again never stacks handlers.
+
+    Arguments:
+    fields -- the fields to obfuscate
+    level -- the logging level of the logger
+    stream -- the stream to write to, sys.stderr by default
+    """
+    key = (tuple(fields), level, stream)
+    with _HANDLERS_LOCK:
+        handler = _HANDLERS.get(key)
+        if handler is None:
+            handler = logging.StreamHandler(stream)
+            handler.setFormatter(RedactingFormatter(fields=list(fields)))
+            _HANDLERS[key] = handler
+        return _install_handler(handler, level)
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """ Stream handler buffering formatted records and writing them in batches
+    """
+
+    def __init__(self, stream=None, batch_size: int = 100):
+        """
+        Arguments:
+        stream -- the stream to write to, sys.stderr by default
+        batch_size -- the number of records buffered before a write
+        """
+        super(BatchingStreamHandler, self).__init__(stream)
+        self.batch_size = batch_size
+        self._buffer = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Format the record and buffer it, writing once the batch is full.
+        """
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write every buffered record in a single call and flush the stream.
+        """
+        self.acquire()
+        try:
+            if self._buffer and self.stream:
+                self.stream.write(''.join(self._buffer))
+                self._buffer.clear()
+            super(BatchingStreamHandler, self).flush()
+        finally:
+            self.release()
+
+
+class RedactingQueueListener(QueueListener):
+    """ Queue listener flushing its handlers whenever the queue runs dry
+    """
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        """
+        Return the next record, flushing pending batches before waiting.
+        """
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
+
+    def enqueue_sentinel(self) -> None:
+        """
+        Wait for room in the queue so stopping never fails on a full queue.
+        """
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        """
+        Drain the queue, stop the worker thread and flush the handlers.
+        """
+        if self._thread is None:
+            return
+        super(RedactingQueueListener, self).stop()
+        for handler in self.handlers:
+            handler.flush()
+
+
+class RedactingQueueHandler(QueueHandler):
+    """ Queue handler enqueuing raw records with a bounded-queue overflow policy
+    """
+
+    OVERFLOW_POLICIES = ("block", "drop_oldest", "drop")
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "block"):
+        """
+        Arguments:
+        log_queue -- the queue shared with the listener
+        overflow -- what to do when the queue is full: "block" the caller,
+        "drop_oldest" queued record, or "drop" the new one; drops are counted
+        """
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError("Unknown overflow policy: {}".format(overflow))
+        super(RedactingQueueHandler, self).__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self.listener = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Return the record untouched: formatting and redaction happen on the
+        listener thread, so arguments must not be mutated after logging.
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Put the record in the queue according to the overflow policy.
+        """
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                self.dropped += 1
+                if self.overflow == "drop":
+                    return
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+
+    def close(self) -> None:
+        """
+        Stop the listener so every queued record is written before closing.
+        """
+        if self.listener is not None:
+            self.listener.stop()
+        super(RedactingQueueHandler, self).close()
+
+
+def get_async_logger(fields: Sequence[str] = PII_FIELDS,
+                     level: int = logging.INFO, maxsize: int = 10000,
+                     overflow: str = "block", batch_size: int = 100,
+                     stream=None) -> logging.Logger:
     """
-    Connects to the MySQL database using environment variables and returns a connection object.
+    Returns the user_data logger whose records are redacted and written by
+    a background thread, replacing any handler it had.
+
+    Arguments:
+    fields -- the fields to obfuscate
+    level -- the logging level of the logger
+    maxsize -- the maximum number of records waiting in the queue
+    overflow -- the RedactingQueueHandler overflow policy
+    batch_size -- the number of records written per stream write
+    stream -- the stream to write to, sys.stderr by default
+    """
+    stream_handler = BatchingStreamHandler(stream, batch_size)
+    stream_handler.setFormatter(RedactingFormatter(fields=list(fields)))
+    log_queue = queue.Queue(maxsize)
+    queue_handler = RedactingQueueHandler(log_queue, overflow)
+    queue_handler.listener = RedactingQueueListener(log_queue, stream_handler)
+    queue_handler.listener.start()
+    with _HANDLERS_LOCK:
+        return _install_handler(queue_handler, level)
+
+
+class PooledConnection:
+    """ Connection checked out of a ConnectionPool
+
+    Behaves like the underlying connection, except that close() gives it
+    back to the pool instead of closing it. A PooledConnection collected
+    without being closed closes its connection and frees its pool slot.
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn):
+        """
+        Arguments:
+        pool -- the pool the connection is given back to
+        conn -- the DB-API connection checked out of the pool
+        """
+        self._pool = pool
+        self._conn = conn
+        self._finalizer = weakref.finalize(self, pool._discard, conn)
+
+    def __getattr__(self, name: str):
+        """
+        Returns the attribute of the underlying connection, or raises
+        ValueError once the connection was given back to the pool.
+        """
+        if self._conn is None:
+            raise ValueError(
+                "Connection already returned to the pool: {}".format(name))
+        return getattr(self._conn, name)
+
+    def close(self) -> None:
+        """
+        Return the connection to its pool.
+        """
+        if self._conn is not None:
+            self._finalizer.detach()
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    def __enter__(self) -> "PooledConnection":
+        """
+        Returns the connection for the duration of a with block.
+        """
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """
+        Gives the connection back to its pool at the end of a with block.
+        """
+        self.close()
+
+
+def is_alive(conn) -> bool:
+    """
+    Returns True if the connection can still run a query.
+    """
+    try:
+        if hasattr(conn, "is_connected"):
+            return conn.is_connected()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    """ Bounded pool of reusable DB-API connections
+    """
+
+    def __init__(self, connect: Callable, size: int = 5,
+                 idle_timeout: float = 300.0,
+                 health_check: Callable = is_alive):
+        """
+        Arguments:
+        connect -- a callable returning a new DB-API connection
+        size -- the maximum number of open connections
+        idle_timeout -- seconds after which an idle connection is closed
+        health_check -- a callable run on a connection before lending it
+        """
+        self.connect = connect
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self._idle = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float = None) -> PooledConnection:
+        """
+        Returns a healthy connection, reusing the most recently released
+        idle one or opening a new one while under size. Waits for a
+        release when the pool is exhausted and raises TimeoutError if
+        none comes within timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._open >= self.size:
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError("Connection pool exhausted")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                else:
+                    conn, released_at = None, None
+                    self._open += 1
+            if conn is None:
+                try:
+                    return PooledConnection(self, self.connect())
+                except Exception:
+                    self._discard(None)
+                    raise
+            expired = time.monotonic() - released_at > self.idle_timeout
+            if not expired and self.health_check(conn):
+                return PooledConnection(self, conn)
+            self._discard(conn)
+
+    def release(self, conn) -> None:
+        """
+        Rolls back the transaction the borrower left open and gives the
+        connection back to the pool, or discards it if the rollback fails.
+        """
+        try:
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn) -> None:
+        """
+        Closes a connection and frees its slot in the pool.
+        """
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def checkout(self, timeout: float = None) -> Iterator[PooledConnection]:
+        """
+        Lends a connection for the duration of a with block.
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        """
+        Closes every idle connection.
+        """
+        with self._cond:
+            idle, self._idle = self._idle, deque()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_DB_POOL = None
+_DB_POOL_LOCK = threading.Lock()
+
+
+def db_connector() -> Callable[[], connection.MySQLConnection]:
+    """
+    Reads the connection settings from the environment once and returns a
+    callable connecting to the MySQL database with them.
     """
     user = os.getenv('PERSONAL_DATA_DB_USERNAME', 'root')
     password = os.getenv('PERSONAL_DATA_DB_PASSWORD', '')
     host = os.getenv('PERSONAL_DATA_DB_HOST', 'localhost')
     database = os.getenv('PERSONAL_DATA_DB_NAME')
-    
-    return mysql.connector.connect(
+
+    return partial(
+        mysql.connector.connect,
         user=user,
         password=password,
         host=host,
@@ -77,23 +625,163 @@ def get_db() -> connection.MySQLConnection:
     )
 
 
-def main() -> None:
+def get_db_pool() -> ConnectionPool:
     """
-    Main function to fetch and log user data from the database.
+    Returns the connection pool of the personal data database, created on
+    first use from the environment. PERSONAL_DATA_DB_POOL_SIZE and
+    PERSONAL_DATA_DB_IDLE_TIMEOUT tune its size and idle timeout.
+    """
+    global _DB_POOL
+    with _DB_POOL_LOCK:
+        if _DB_POOL is None:
+            _DB_POOL = ConnectionPool(
+                db_connector(),
+                size=int(os.getenv('PERSONAL_DATA_DB_POOL_SIZE', '5')),
+                idle_timeout=float(
+                    os.getenv('PERSONAL_DATA_DB_IDLE_TIMEOUT', '300')))
+        return _DB_POOL
+
+
+def get_db(timeout: float = None) -> connection.MySQLConnection:
+    """
+    Returns a connection to the MySQL database from the pool; closing it
+    gives it back to the pool. Raises TimeoutError when the pool stays
+    exhausted for timeout seconds, PERSONAL_DATA_DB_CHECKOUT_TIMEOUT (30
+    by default), so connections that are never closed fail loudly
+    instead of blocking every later caller.
+    """
+    if timeout is None:
+        timeout = float(os.getenv('PERSONAL_DATA_DB_CHECKOUT_TIMEOUT', '30'))
+    return get_db_pool().acquire(timeout)
+
+
+USER_COLUMNS = ("name", "email", "phone", "ssn", "password", "ip",
+                "last_login", "user_agent")
+
+
+def row_fields(row: Sequence) -> Dict[str, Any]:
+    """
+    Returns a row of the users table as a mapping of column to value,
+    to be logged through the structured path of RedactingFormatter.
+    """
+    return dict(zip(USER_COLUMNS, row))
+
+
+def stream_rows(cursor, chunk_size: int = 1000) -> Iterator[Sequence]:
+    """
+    Yields the rows of an executed query, fetching chunk_size rows at a
+    time so only one chunk is held in memory.
+
+    Arguments:
+    cursor -- a DB-API cursor on which a query has been executed
+    chunk_size -- the number of rows fetched per fetchmany call
+    """
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def export_users(cursor, logger: logging.Logger,
+                 chunk_size: int = 1000) -> int:
+    """
+    Logs every row of the users table through the given logger and
+    returns the number of rows logged. Works with any DB-API cursor.
+
+    Arguments:
+    cursor -- a DB-API cursor of the database holding the users table
+    logger -- the logger the rows are written to
+    chunk_size -- the number of rows fetched per fetchmany call
     """
-    db = get_db()
-    cursor = db.cursor()
     cursor.execute("SELECT * FROM users;")
-    rows = cursor.fetchall()
-    logger = get_logger()
-    
+    count = 0
+    for row in stream_rows(cursor, chunk_size):
+        logger.info(row_fields(row))
+        count += 1
+    return count
+
+
+_WORKER_FORMATTER = None
+
+
+def _init_redaction_worker(fields: Sequence[str]) -> None:
+    """
+    Builds the formatter used by a redaction worker process.
+    """
+    global _WORKER_FORMATTER
+    _WORKER_FORMATTER = RedactingFormatter(fields=list(fields))
+
+
+def _redact_rows(rows: List[Sequence]) -> str:
+    """
+    Returns the redacted log lines of a batch of rows, ready to be written.
+    """
+    lines = []
     for row in rows:
-        message = f"name={row[0]}; email={row[1]}; phone={row[2]}; ssn={row[3]}; password={row[4]}; ip={row[5]}; last_login={row[6]}; user_agent={row[7]};"
-        logger.info(message)
-    
-    cursor.close()
-    db.close()
+        record = logging.LogRecord("user_data", logging.INFO, __file__, 0,
+                                   row_fields(row), None, None)
+        lines.append(_WORKER_FORMATTER.format(record) + "\n")
+    return "".join(lines)
+
+
+def export_users_parallel(cursor, workers: int, chunk_size: int = 1000,
+                          stream=None) -> int:
+    """
+    Logs every row of the users table like export_users, redacting the
+    chunks on a pool of worker processes and writing them in their
+    original order. At most two chunks per worker are in flight.
+    Returns the number of rows written.
+
+    Arguments:
+    cursor -- a DB-API cursor of the database holding the users table
+    workers -- the number of worker processes
+    chunk_size -- the number of rows fetched and redacted per batch
+    stream -- the stream to write to, sys.stderr by default
+    """
+    stream = stream if stream is not None else sys.stderr
+    cursor.execute("SELECT * FROM users;")
+    pending = deque()
+    count = 0
+    with ProcessPoolExecutor(workers, initializer=_init_redaction_worker,
+                             initargs=(PII_FIELDS,)) as executor:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if rows:
+                count += len(rows)
+                pending.append(executor.submit(_redact_rows, list(rows)))
+            if pending and (not rows or len(pending) >= workers * 2):
+                stream.write(pending.popleft().result())
+            if not rows and not pending:
+                break
+    stream.flush()
+    return count
+
+
+def main(chunk_size: int = 1000, workers: int = 1) -> None:
+    """
+    Main function to fetch and log user data from the database.
+    Rows are read through an unbuffered cursor in chunk_size batches, so
+    memory use does not depend on the size of the table. With more than
+    one worker, the batches are redacted on a process pool.
+    """
+    db = get_db()
+    cursor = db.cursor(buffered=False)
+    try:
+        if workers > 1:
+            export_users_parallel(cursor, workers, chunk_size)
+        else:
+            export_users(cursor, get_logger(), chunk_size)
+    finally:
+        cursor.close()
+        db.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Log the users table")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of redaction worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="number of rows fetched per batch")
+    args = parser.parse_args()
+    main(args.chunk_size, args.workers)
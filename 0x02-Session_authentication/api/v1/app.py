@@ -3,12 +3,33 @@
 Route module for the API
 """
 from os import getenv
+from api.v1.auth import load_backend
 from api.v1.views import app_views
-from flask import Flask, jsonify, abort, request
+from flask import Flask, Request, current_app, jsonify, abort, request
 from flask_cors import CORS
+from werkzeug.utils import cached_property
+
+
+class ApiRequest(Request):
+    """
+    Request whose user is resolved by the auth backend the first time
+    current_user is read, then memoized for the rest of the request
+    """
+
+    @cached_property
+    def current_user(self):
+        """
+        Returns the User authenticated by the request, or None
+        """
+        auth = current_app.extensions.get("auth")
+        if auth is None:
+            return None
+        return auth.current_user(self)
+
 
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = ApiRequest
 
 # Register blueprints for API routes
 app.register_blueprint(app_views)
@@ -16,34 +37,30 @@ app.register_blueprint(app_views)
 # Enable Cross-Origin Resource Sharing (CORS)
 CORS(app, resources={r"/api/v1/*": {"origins": "*"}})
 
-# Determine authentication type
+# Determine authentication type, importing only the selected backend
 auth = None
 AUTH_TYPE = getenv("AUTH_TYPE")
-if AUTH_TYPE == "auth":
-    from api.v1.auth.auth import Auth
-    auth = Auth()
-elif AUTH_TYPE == "basic_auth":
-    from api.v1.auth.basic_auth import BasicAuth
-    auth = BasicAuth()
+auth_class = load_backend(AUTH_TYPE)
+if auth_class is not None:
+    auth = auth_class()
+app.extensions["auth"] = auth
 
 # Before Request Filter
 @app.before_request
 def bef_req():
     """
     Filter each request before it's handled by the proper route
+    The user of a protected path is resolved once, through
+    request.current_user, and handlers read the same memoized value
     """
     if auth is None:
         pass
     else:
-        excluded = [
-            '/api/v1/status/',
-            '/api/v1/unauthorized/',
-            '/api/v1/forbidden/'
-        ]
-        if auth.require_auth(request.path, excluded):
-            if auth.authorization_header(request) is None:
+        if auth.require_auth(request.path, auth.excluded_paths):
+            if auth.authorization_header(request) is None and \
+                    auth.session_cookie(request) is None:
                 abort(401, description="Unauthorized")
-            if auth.current_user(request) is None:
+            if request.current_user is None:
                 abort(403, description="Forbidden")
 
 # Error Handlers
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Registry of the authentication backends selected with AUTH_TYPE
+Backends are registered as "module:Class" strings, so only the module of
+the selected backend is imported at startup
+"""
+from importlib import import_module
+
+BACKENDS = {
+    "auth": "api.v1.auth.auth:Auth",
+    "basic_auth": "api.v1.auth.basic_auth:BasicAuth",
+    "session_auth": "api.v1.auth.session_auth:SessionAuth",
+    "session_exp_auth": "api.v1.auth.session_exp_auth:SessionExpAuth",
+    "session_db_auth": "api.v1.auth.session_db_auth:SessionDBAuth",
+}
+
+
+def register_backend(name: str, target: str):
+    """
+    Registers a backend
+    Args:
+        - name(str): value of AUTH_TYPE selecting the backend
+        - target(str): "module:Class" of the backend
+    """
+    if ":" not in target:
+        raise ValueError("Backend must be 'module:Class': {}".format(target))
+    BACKENDS[name] = target
+
+
+def load_backend(name: str) -> type:
+    """
+    Imports the class of a backend
+    Args:
+        - name(str): registered name of the backend, or a "module:Class"
+          string for a backend that is not registered
+    Return:
+        - the backend class, or None if name is empty
+    """
+    if not name:
+        return None
+    target = BACKENDS.get(name, name)
+    if ":" not in target:
+        raise ValueError("Unknown AUTH_TYPE: {}".format(name))
+    module, _, attr = target.partition(":")
+    return getattr(import_module(module), attr)
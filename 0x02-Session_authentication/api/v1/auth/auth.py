@@ -3,42 +3,130 @@
 Definition of class Auth
 """
 from flask import request
+from functools import lru_cache
+from os import getenv
 from typing import (
+    Iterable,
     List,
-    TypeVar
+    TypeVar,
+    Union
 )
 
 
+class PathMatcher:
+    """
+    Paths that do not require authentication, compiled once
+    Paths are compared without their trailing slash in a set, and the
+    prefixes of paths ending with "*" are stored in a trie, so matching
+    costs the same whatever the number of paths
+    """
+    END = None
+
+    def __init__(self, paths: Iterable[str]):
+        """
+        Compile paths
+        Args:
+            - paths(Iterable of str): exact paths, or prefixes ending with
+              "*"
+        """
+        self.paths = tuple(paths)
+        self.exact = set()
+        self.trie = {}
+        for excluded in self.paths:
+            if excluded.endswith("*"):
+                node = self.trie
+                for char in excluded[:-1]:
+                    node = node.setdefault(char, {})
+                node[self.END] = True
+            else:
+                self.exact.add(excluded.rstrip("/"))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of compiled paths
+        """
+        return len(self.paths)
+
+    def match(self, path: str) -> bool:
+        """
+        Determines whether a path is one of the compiled paths
+        Args:
+            - path(str): Url path to be checked
+        Return:
+            - True if path matches a path or a prefix, else False
+        """
+        if path.rstrip("/") in self.exact:
+            return True
+        node = self.trie
+        for char in path:
+            if self.END in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return self.END in node
+
+
+@lru_cache(maxsize=32)
+def compile_paths(paths: tuple) -> PathMatcher:
+    """
+    Returns the PathMatcher of paths, compiled once per tuple of paths
+    """
+    return PathMatcher(paths)
+
+
 class Auth:
     """
     Manages the API authentication
+    Each backend declares the paths it does not protect in EXCLUDED_PATHS,
+    compiled once into excluded_paths, and the attributes holding its
+    caches in CACHES
     """
-    def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
+    EXCLUDED_PATHS = (
+        '/api/v1/status/',
+        '/api/v1/unauthorized/',
+        '/api/v1/forbidden/',
+    )
+    CACHES = ()
+
+    def __init__(self):
+        """
+        Compile the excluded paths
+        """
+        self.excluded_paths = compile_paths(tuple(self.EXCLUDED_PATHS))
+
+    def cache_info(self) -> dict:
+        """
+        Returns the counters of each cache of the backend, by attribute
+        """
+        return {name: getattr(self, name).info() for name in self.CACHES}
+
+    def clear_caches(self):
+        """
+        Empties every cache of the backend
+        """
+        for name in self.CACHES:
+            getattr(self, name).clear()
+
+    def require_auth(self, path: str,
+                     excluded_paths: Union[List[str], PathMatcher]) -> bool:
         """
         Determines whether a given path requires authentication or not
         Args:
             - path(str): Url path to be checked
-            - excluded_paths(List of str): List of paths that do not require
-              authentication
+            - excluded_paths(List of str or PathMatcher): paths that do not
+              require authentication, compared with or without a trailing
+              slash, or prefixes ending with "*"
         Return:
             - True if path is not in excluded_paths, else False
         """
         if path is None:
             return True
-        elif excluded_paths is None or excluded_paths == []:
+        elif excluded_paths is None or len(excluded_paths) == 0:
             return True
-        elif path in excluded_paths:
-            return False
-        else:
-            for i in excluded_paths:
-                if i.startswith(path):
-                    return False
-                if path.startswith(i):
-                    return False
-                if i[-1] == "*":
-                    if path.startswith(i[:-1]):
-                        return False
-        return True
+        if not isinstance(excluded_paths, PathMatcher):
+            excluded_paths = compile_paths(tuple(excluded_paths))
+        return not excluded_paths.match(path)
 
     def authorization_header(self, request=None) -> str:
         """
@@ -56,3 +144,11 @@ class Auth:
         Returns a User instance from information from a request object
         """
         return None
+
+    def session_cookie(self, request=None) -> str:
+        """
+        Returns the value of the SESSION_NAME cookie of a request object
+        """
+        if request is None:
+            return None
+        return request.cookies.get(getenv("SESSION_NAME"))
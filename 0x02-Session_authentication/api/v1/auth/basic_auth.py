@@ -3,16 +3,124 @@
 Definition of class BasicAuth
 """
 import base64
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
 from .auth import Auth
-from typing import TypeVar
+from typing import Tuple, TypeVar
 
 from models.user import User
 
 
+class CredentialCache:
+    """ Bounded LRU cache of verified Authorization headers, each kept
+    for ttl seconds
+    Headers are stored as a hash keyed with a per-process random key, so
+    credentials are never kept in memory, and map to the user id, email
+    and password hash that were verified
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0):
+        """
+        Create an empty cache of at most maxsize entries
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def digest(self, authorization_header: str) -> bytes:
+        """
+        Returns the keyed hash of an Authorization header
+        """
+        return hashlib.blake2b(authorization_header.encode('utf-8'),
+                               key=self._key, digest_size=16).digest()
+
+    def get(self, digest: bytes) -> Tuple[str, str, str]:
+        """
+        Returns the (user id, email, password hash) of a header hash, or
+        None if it is missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[3] < time.monotonic():
+                if entry is not None:
+                    del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return entry[:3]
+
+    def put(self, digest: bytes, user_id: str, email: str, password: str):
+        """
+        Stores the user verified for a header hash, evicting the least
+        recently used entry when full
+        """
+        with self._lock:
+            self._entries[digest] = (user_id, email, password,
+                                     time.monotonic() + self.ttl)
+            self._entries.move_to_end(digest)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def count(self, hit: bool):
+        """
+        Counts a hit or a miss
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def discard(self, digest: bytes):
+        """
+        Removes the entry of a header hash
+        """
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        """
+        Returns the hit and miss counters and the size of the cache
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "maxsize": self.maxsize, "currsize": len(self._entries)}
+
+
 class BasicAuth(Auth):
     """ Implements Basic Authorization protocol methods
+    Verified headers are cached in credential_cache. An entry is only
+    used while its user still exists with the same email and password,
+    so saving a new password or removing the user, from any process
+    sharing the storage, invalidates it
     """
 
+    CACHES = ("credential_cache",)
+    CACHE_SIZE = 10000
+    CACHE_TTL = 300.0
+
+    def __init__(self):
+        """
+        Create the verified credential cache
+        """
+        super().__init__()
+        self.credential_cache = CredentialCache(self.CACHE_SIZE,
+                                                self.CACHE_TTL)
+
     def extract_base64_authorization_header(self,
                                             authorization_header: str) -> str:
         """
@@ -87,6 +195,18 @@ class BasicAuth(Auth):
         if not authorization_header:
             return None
 
+        cache = self.credential_cache
+        digest = cache.digest(authorization_header)
+        cached = cache.get(digest)
+        if cached is not None:
+            user = User.get(cached[0])
+            if user is not None and user.email == cached[1] and \
+                    user.password == cached[2]:
+                cache.count(True)
+                return user
+            cache.discard(digest)
+        cache.count(False)
+
         token = self.extract_base64_authorization_header(authorization_header)
         if not token:
             return None
@@ -99,4 +219,7 @@ class BasicAuth(Auth):
         if not email:
             return None
 
-        return self.user_object_from_credentials(email, password)
+        user = self.user_object_from_credentials(email, password)
+        if user is not None:
+            cache.put(digest, user.id, user.email, user.password)
+        return user
@@ -1,44 +1,259 @@
 #!/usr/bin/env python3
-""" Module of Users views
 """
-import os
-from flask import jsonify, request, abort
-from api.v1.views import app_views
+Definition of class SessionAuth
+"""
+import threading
+import time
+import uuid
+from collections.abc import Mapping
+from .auth import Auth
+from typing import Iterator, Tuple, TypeVar
+
 from models.user import User
-from api.v1.app import auth
 
 
-@app_views.route('/auth_session/login', methods=['POST'], strict_slashes=False)
-def auth_session():
+class SessionStore:
+    """ Sessions by id, each mapped to its user id and expiry time
+    Expiring sessions are also filed in a timing wheel of one bucket per
+    RESOLUTION seconds, kept in a dict so empty ticks cost nothing. Once
+    a tick has passed, every session of its bucket has expired, so
+    sweep() removes them without scanning the live ones, at most
+    SWEEP_BATCH at a time, as lookups and new sessions go by
     """
-    Handle user login
-    Return:
-        dictionary representation of user if found else error message
-    """
-    email = request.form.get('email')
-    password = request.form.get('password')
-    if email is None or email == '':
-        return jsonify({"error": "email missing"}), 400
-    if password is None or password == '':
-        return jsonify({"error": "password missing"}), 400
-    users = User.search({"email": email})
-    if not users or users == []:
-        return jsonify({"error": "no user found for this email"}), 404
-    for user in users:
-        if user.is_valid_password(password):
-            session_id = auth.create_session(user.id)
-            resp = jsonify(user.to_json())
-            session_name = os.getenv('SESSION_NAME')
-            resp.set_cookie(session_name, session_id)
-            return resp
-    return jsonify({"error": "wrong password"}), 401
-
-
-@app_views.route('/auth_session/logout', methods=['DELETE'], strict_slashes=False)
-def handle_logout():
+    RESOLUTION = 1.0
+    SWEEP_BATCH = 1000
+
+    def __init__(self, duration: float = 0):
+        """
+        Create an empty store of sessions lasting duration seconds, or
+        forever if duration is not positive
+        """
+        self.duration = duration if duration > 0 else 0
+        self.clock = time.time
+        self.expired = 0
+        self._sessions = {}
+        self._wheel = {}
+        self._tick = self._tick_of(self.clock())
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of sessions, including expired sessions not
+        swept yet
+        """
+        return len(self._sessions)
+
+    def _tick_of(self, moment: float) -> int:
+        """
+        Returns the wheel tick a moment falls in
+        """
+        return int(moment // self.RESOLUTION)
+
+    def put(self, session_id: str, user_id: str, expires_at: float = None):
+        """
+        Stores a session of user_id, expiring duration seconds from now or
+        at expires_at
+        """
+        now = self.clock()
+        with self._lock:
+            if not self.duration:
+                self._sessions[session_id] = (user_id, None)
+                return
+            if expires_at is None:
+                expires_at = now + self.duration
+            self._sessions[session_id] = (user_id, expires_at)
+            tick = self._tick_of(expires_at)
+            bucket = self._wheel.get(tick)
+            if bucket is None:
+                bucket = self._wheel[tick] = set()
+            bucket.add(session_id)
+        self.sweep(now)
+
+    def get(self, session_id: str) -> str:
+        """
+        Returns the user id of a live session, or None
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        expires_at = entry[1]
+        if expires_at is None:
+            return entry[0]
+        now = self.clock()
+        if now >= expires_at:
+            self.pop(session_id)
+            return None
+        if self._tick_of(now) > self._tick:
+            self.sweep(now)
+        return entry[0]
+
+    def pop(self, session_id: str) -> Tuple[str, float]:
+        """
+        Removes a session and returns its (user id, expiry time), or None
+        """
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None and entry[1] is not None:
+                tick = self._tick_of(entry[1])
+                bucket = self._wheel.get(tick)
+                if bucket is not None:
+                    bucket.discard(session_id)
+                    if not bucket:
+                        del self._wheel[tick]
+            return entry
+
+    def sweep(self, now: float = None, budget: int = None) -> int:
+        """
+        Removes the sessions of the ticks that have passed, at most budget
+        of them, and returns how many were removed
+        """
+        if not self.duration:
+            return 0
+        now = self.clock() if now is None else now
+        budget = self.SWEEP_BATCH if budget is None else budget
+        target = self._tick_of(now)
+        if self._tick >= target or not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            removed = 0
+            if target - self._tick > len(self._wheel):
+                ticks = sorted(tick for tick in self._wheel if tick < target)
+            else:
+                ticks = range(self._tick, target)
+            for tick in ticks:
+                bucket = self._wheel.get(tick)
+                while bucket and removed < budget:
+                    self._sessions.pop(bucket.pop(), None)
+                    removed += 1
+                if bucket:
+                    break
+                self._wheel.pop(tick, None)
+                self._tick = tick + 1
+            else:
+                self._tick = target
+            self.expired += removed
+            return removed
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        """
+        Removes every session
+        """
+        with self._lock:
+            self._sessions.clear()
+            self._wheel.clear()
+
+    def info(self) -> dict:
+        """
+        Returns the number of sessions, of ticks waiting to be swept and of
+        sessions swept
+        """
+        return {"sessions": len(self._sessions), "ticks": len(self._wheel),
+                "expired": self.expired}
+
+
+class SessionUserIds(Mapping):
+    """ Read-only view of the user id of each session of a SessionStore,
+    including expired sessions not swept yet
     """
-    Handle user logout
+
+    def __init__(self, store: SessionStore):
+        """
+        Create a view of store
+        """
+        self._store = store
+
+    def __getitem__(self, session_id: str) -> str:
+        """
+        Returns the user id of a session
+        """
+        return self._store._sessions[session_id][0]
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Returns an iterator over the session ids
+        """
+        return iter(list(self._store._sessions))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of sessions
+        """
+        return len(self._store)
+
+    def __repr__(self) -> str:
+        """
+        Returns the sessions as a dict would print them
+        """
+        return repr(dict(self))
+
+
+class SessionAuth(Auth):
+    """ Implements Session Authorization protocol methods
+    Sessions are kept in memory by session_store, so current_user costs
+    a dict lookup on the SESSION_NAME cookie. They last
+    session_duration() seconds, forever for SessionAuth
     """
-    if auth.destroy_session(request):
-        return jsonify({}), 200
-    abort(404)
+
+    EXCLUDED_PATHS = Auth.EXCLUDED_PATHS + ('/api/v1/auth_session/login/',)
+    SESSION_DURATION = 0
+
+    def __init__(self):
+        """
+        Create the session store
+        """
+        super().__init__()
+        self.session_store = SessionStore(self.session_duration())
+
+    def session_duration(self) -> int:
+        """
+        Returns the number of seconds a session lasts, 0 for ever
+        """
+        return self.SESSION_DURATION
+
+    @property
+    def user_id_by_session_id(self) -> SessionUserIds:
+        """
+        Returns a read-only mapping of session ID to user ID
+        """
+        return SessionUserIds(self.session_store)
+
+    def create_session(self, user_id: str = None) -> str:
+        """
+        Creates a Session ID for a user_id
+        """
+        if not user_id or not isinstance(user_id, str):
+            return None
+        session_id = str(uuid.uuid4())
+        self.session_store.put(session_id, user_id)
+        return session_id
+
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """
+        Returns the user ID of a live Session ID
+        """
+        if not session_id or not isinstance(session_id, str):
+            return None
+        return self.session_store.get(session_id)
+
+    def current_user(self, request=None) -> TypeVar('User'):
+        """
+        Returns a User instance based on the session cookie of a request
+        """
+        user_id = self.user_id_for_session_id(self.session_cookie(request))
+        if user_id is None:
+            return None
+        return User.get(user_id)
+
+    def destroy_session(self, request=None) -> bool:
+        """
+        Deletes the session of a request, logging the user out
+        """
+        session_id = self.session_cookie(request)
+        if session_id is None:
+            return False
+        if self.user_id_for_session_id(session_id) is None:
+            return False
+        self.session_store.pop(session_id)
+        return True
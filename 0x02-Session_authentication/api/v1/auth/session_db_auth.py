@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Definition of class SessionDBAuth
+"""
+import uuid
+from datetime import timezone
+from .session_auth import SessionStore
+from .session_exp_auth import SessionExpAuth
+
+from models.user_session import UserSession
+
+
+class SessionDBAuth(SessionExpAuth):
+    """ Session authentication whose sessions are UserSession objects, so
+    they outlive the process and are shared by the workers
+    Logins and logouts are written behind by UserSession. Each worker
+    reads sessions through session_store, which keeps them CACHE_TTL
+    seconds at most: a logout is seen at once by the worker that handled
+    it, and within CACHE_TTL seconds by the others
+    """
+
+    CACHES = ("session_store",)
+    CACHE_TTL = 5.0
+
+    def __init__(self):
+        """
+        Load the sessions and create the per-worker session cache
+        """
+        super().__init__()
+        self.session_store = SessionStore(self.CACHE_TTL)
+        UserSession.load_from_file()
+
+    def create_session(self, user_id: str = None) -> str:
+        """
+        Creates and stores a UserSession for a user_id
+        """
+        if not user_id or not isinstance(user_id, str):
+            return None
+        user_session = UserSession(user_id=user_id,
+                                   session_id=str(uuid.uuid4()))
+        user_session.save()
+        self.cache_session(user_session)
+        return user_session.session_id
+
+    def cache_session(self, user_session: UserSession) -> str:
+        """
+        Caches a UserSession until it expires, CACHE_TTL seconds at most
+        Return:
+            - its user ID, or None if it has expired, in which case it is
+              removed
+        """
+        now = self.session_store.clock()
+        expires_at = now + self.CACHE_TTL
+        duration = self.session_duration()
+        if duration > 0:
+            created_at = user_session.created_at.replace(tzinfo=timezone.utc)
+            session_expires_at = created_at.timestamp() + duration
+            if session_expires_at <= now:
+                user_session.remove()
+                return None
+            expires_at = min(expires_at, session_expires_at)
+        self.session_store.put(user_session.id, user_session.user_id,
+                               expires_at)
+        return user_session.user_id
+
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """
+        Returns the user ID of a live Session ID, from the cache or else
+        from its UserSession
+        """
+        if not session_id or not isinstance(session_id, str):
+            return None
+        user_id = self.session_store.get(session_id)
+        if user_id is not None:
+            return user_id
+        user_session = UserSession.get(session_id)
+        if user_session is None:
+            return None
+        return self.cache_session(user_session)
+
+    def destroy_session(self, request=None) -> bool:
+        """
+        Deletes the UserSession of a request and its cache entry
+        """
+        session_id = self.session_cookie(request)
+        if self.user_id_for_session_id(session_id) is None:
+            return False
+        self.session_store.pop(session_id)
+        user_session = UserSession.get(session_id)
+        if user_session is not None:
+            user_session.remove()
+        return True
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Definition of class SessionExpAuth
+"""
+from os import getenv
+from .session_auth import SessionAuth
+
+
+class SessionExpAuth(SessionAuth):
+    """ Session authentication whose sessions expire after
+    SESSION_DURATION seconds
+    """
+
+    def session_duration(self) -> int:
+        """
+        Returns the SESSION_DURATION environment variable, 0 if it is
+        missing or invalid
+        """
+        try:
+            return int(getenv("SESSION_DURATION", 0))
+        except ValueError:
+            return 0
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+""" JSON encoding of API responses, with orjson when it is installed
+"""
+from flask import Response
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    """ Encode obj as compact JSON with sorted keys, like jsonify()
+    Args:
+      - obj: JSON serializable object
+    Return:
+      - the UTF-8 encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def json_response(body: bytes, status: int = 200) -> Response:
+    """ Build a response from an already encoded JSON document
+    Args:
+      - body: JSON document, as returned by dumps()
+      - status: HTTP status code
+    Return:
+      - the application/json response
+    """
+    return Response(body, status=status, mimetype="application/json")
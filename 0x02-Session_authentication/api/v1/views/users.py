@@ -1,19 +1,118 @@
 #!/usr/bin/env python3
 """ Module of Users views
 """
+from api.v1.encoder import dumps, json_response
 from api.v1.views import app_views
-from flask import abort, jsonify, request
+from flask import Response, abort, jsonify, request, url_for
+from itertools import islice
 from models.user import User
+from typing import Iterator, Tuple
+import base64
+import json
+
+USERS_JSON = {}
+MAX_PAGE_SIZE = 1000
+STREAM_FORMATS = {
+    "array": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def encode_cursor(key: Tuple[str, str]) -> str:
+    """ Encode the sort key of the last User of a page as a cursor
+    """
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """ Return the sort key of a cursor, or None if it is invalid
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        return None
+    if type(key) is not list or len(key) != 2 or \
+            not all(type(part) is str for part in key):
+        return None
+    return tuple(key)
+
+
+def stream_users(after: Tuple[str, str], limit: int,
+                 stream: str) -> Iterator[bytes]:
+    """ Yield the users after a sort key, up to limit, as a JSON array or
+    as NDJSON, User.ORDER_CHUNK users at a time
+    """
+    if stream == "array":
+        yield b"["
+    users = islice(User.ordered(after), limit)
+    separator = b"," if stream == "array" else b"\n"
+    first = True
+    while True:
+        chunk = [dumps(user.to_json())
+                 for key, user in islice(users, User.ORDER_CHUNK)]
+        if not chunk:
+            break
+        if stream == "ndjson":
+            chunk.append(b"")
+        yield (b"" if first or stream == "ndjson" else separator) + \
+            separator.join(chunk)
+        first = False
+    if stream == "array":
+        yield b"]"
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def view_all_users() -> str:
     """ GET /api/v1/users
+    Query parameters (optional):
+      - limit: page size, at most MAX_PAGE_SIZE
+      - cursor: cursor of the previous page, from its Link header
+      - stream: "array" or "ndjson", to stream the users as they are
+        serialized instead of building the response first
+    Users are sorted by created_at then id when any parameter is given
     Return:
-      - list of all User objects JSON represented
+      - list of all User objects JSON represented, encoded once per
+        User.generation()
+      - 400 if a parameter is invalid
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor")
+    stream = request.args.get("stream")
+    if limit is not None or cursor is not None or stream is not None:
+        after = None
+        if cursor is not None:
+            after = decode_cursor(cursor)
+            if after is None:
+                return jsonify({'error': "Wrong cursor"}), 400
+        if stream is not None:
+            if stream not in STREAM_FORMATS:
+                return jsonify({'error': "Wrong stream format"}), 400
+            if limit is not None and (not limit.isdigit() or
+                                      int(limit) < 1):
+                return jsonify({'error': "Wrong limit"}), 400
+            limit = None if limit is None else int(limit)
+            return Response(stream_users(after, limit, stream),
+                            mimetype=STREAM_FORMATS[stream])
+        if limit is None:
+            limit = MAX_PAGE_SIZE
+        elif not limit.isdigit() or int(limit) < 1:
+            return jsonify({'error': "Wrong limit"}), 400
+        limit = min(int(limit), MAX_PAGE_SIZE)
+        page = list(islice(User.ordered(after), limit + 1))
+        response = json_response(dumps([user.to_json()
+                                        for key, user in page[:limit]]))
+        if len(page) > limit:
+            response.headers["Link"] = '<{}>; rel="next"'.format(url_for(
+                "app_views.view_all_users", limit=limit,
+                cursor=encode_cursor(page[limit - 1][0])))
+        return response
+    generation, body = USERS_JSON.get("all", (None, None))
+    current = User.generation()
+    if generation != current:
+        generation = current
+        body = dumps([user.to_json() for user in User.all()])
+        USERS_JSON["all"] = (generation, body)
+    return json_response(body)
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
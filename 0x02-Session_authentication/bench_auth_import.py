@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+""" Benchmark of the startup import time of each authentication backend
+Each backend is loaded in its own process, after flask and the models, so
+the time measured is what selecting it adds to the startup of the API:
+bench_auth_import.py [AUTH_TYPE ...]
+"""
+import subprocess
+import sys
+import time
+
+
+def measure(name: str):
+    """ Load and create the backend name and print the time taken and the
+    number of modules imported
+    """
+    import flask
+    import models.user
+    from api.v1.auth import load_backend
+
+    modules = len(sys.modules)
+    start = time.perf_counter()
+    backend = load_backend(name)()
+    seconds = time.perf_counter() - start
+    print("{:<18} {:>7.2f}ms, {:>3} modules, {} excluded paths".format(
+        name, seconds * 1e3, len(sys.modules) - modules,
+        len(backend.excluded_paths)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--measure":
+        measure(sys.argv[2])
+        sys.exit(0)
+    from api.v1.auth import BACKENDS
+    for name in sys.argv[1:] or BACKENDS:
+        subprocess.run([sys.executable, __file__, "--measure", name],
+                       check=True)
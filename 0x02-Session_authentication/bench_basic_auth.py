@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+""" Benchmark of BasicAuth.current_user() with and without the verified
+credential cache
+"""
+import base64
+import os
+import sys
+import time
+
+from api.v1.auth.basic_auth import BasicAuth
+from models.user import User
+
+
+class Request:
+    """ Request carrying an Authorization header
+    """
+
+    def __init__(self, authorization: str):
+        """ Build a request with this Authorization header
+        """
+        self.headers = {"Authorization": authorization}
+
+
+def populate(size: int) -> list:
+    """ Fill the User store with size users and return a request for each
+    """
+    User.load_from_file()
+    requests = []
+    with User.batch():
+        for i in range(size):
+            user = User(email="{}@hbtn.io".format(i))
+            user.password = "H0lbertonSchool98!"
+            user.save()
+            credentials = "{}:H0lbertonSchool98!".format(user.email)
+            requests.append(Request("Basic {}".format(
+                base64.b64encode(credentials.encode()).decode())))
+    return requests
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rounds = 20
+    requests = populate(size)
+    for cache_size in (0, size):
+        BasicAuth.CACHE_SIZE = cache_size
+        auth = BasicAuth()
+        start = time.perf_counter()
+        for i in range(rounds):
+            for request in requests:
+                auth.current_user(request)
+        seconds = (time.perf_counter() - start) / rounds / size
+        print("cache size {:>5}: {:.2f}us per request, {}".format(
+            cache_size, seconds * 1e6, auth.credential_cache.info()))
+    os.remove(User._snapshot_path())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+""" Check the number of auth.current_user() calls each request makes,
+and time the requests, for endpoints excluded from authentication,
+protected, and reading request.current_user
+Each backend runs in its own process, in a temporary directory:
+bench_current_user.py [AUTH_TYPE ...]
+"""
+import base64
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PATHS = {
+    "/api/v1/status": 0,
+    "/api/v1/users": 1,
+    "/api/v1/users/me": 1,
+}
+
+
+def measure(auth_type: str, number: int = 1000):
+    """ Send number requests to each path as a logged in user, check each
+    makes the expected number of backend calls, and print the calls and
+    time per request
+    """
+    os.environ["AUTH_TYPE"] = auth_type
+    os.environ["SESSION_NAME"] = "_my_session_id"
+    os.chdir(tempfile.mkdtemp())
+    from api.v1.app import app, auth
+    from models.user import User
+
+    user = User(email="bob@hbtn.io")
+    user.password = "H0lbertonSchool98!"
+    user.save()
+    client = app.test_client()
+    headers = {}
+    if hasattr(auth, "create_session"):
+        client.set_cookie("_my_session_id", auth.create_session(user.id))
+    else:
+        credentials = b"bob@hbtn.io:H0lbertonSchool98!"
+        headers["Authorization"] = "Basic {}".format(
+            base64.b64encode(credentials).decode())
+
+    calls = [0]
+    current_user = auth.current_user
+
+    def counted_current_user(request=None):
+        calls[0] += 1
+        return current_user(request)
+    auth.current_user = counted_current_user
+
+    for path, expected in PATHS.items():
+        calls[0] = 0
+        start = time.perf_counter()
+        for _ in range(number):
+            before = calls[0]
+            response = client.get(path, headers=headers)
+            assert response.status_code == 200, response.status_code
+            assert calls[0] - before == expected, \
+                "{} {}: {} current_user calls, {} expected".format(
+                    auth_type, path, calls[0] - before, expected)
+        seconds = time.perf_counter() - start
+        print("{:<16} {:<18} {:.2f} current_user calls, {:.0f}us per"
+              " request".format(auth_type, path, calls[0] / number,
+                                seconds / number * 1e6))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--measure":
+        measure(sys.argv[2])
+        sys.exit(0)
+    for auth_type in sys.argv[1:] or ["basic_auth", "session_auth"]:
+        subprocess.run([sys.executable, __file__, "--measure", auth_type],
+                       check=True)
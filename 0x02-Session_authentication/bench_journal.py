@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+""" Benchmark of User.save() per-write cost in snapshot and journal modes
+"""
+import os
+import sys
+import time
+
+from models.base import DATA
+from models.user import User
+
+BATCH = 200
+
+
+def clean():
+    """ Remove the storage files and objects of User
+    """
+    User._close_journal()
+    for file_path in (".db_User.json", ".db_User.journal"):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    User.load_from_file()
+
+
+def run(mode: str, sizes: list):
+    """ Print the average save() time once the store reaches each size
+    """
+    User.STORAGE_MODE = mode
+    clean()
+    for size in sizes:
+        while len(DATA["User"]) < size - BATCH:
+            user = User(email="{}@hbtn.io".format(len(DATA["User"])))
+            DATA["User"][user.id] = user
+        user.save()
+        start = time.perf_counter()
+        for i in range(BATCH):
+            user = User(email="bench{}@hbtn.io".format(i))
+            user.save()
+        seconds = (time.perf_counter() - start) / BATCH
+        print("{:<8} {:>8} users: {:.1f}us per save".format(
+            mode, size, seconds * 1e6))
+    clean()
+
+
+if __name__ == "__main__":
+    sizes = [1000, 10000, 100000]
+    if len(sys.argv) > 1:
+        sizes = [int(arg) for arg in sys.argv[1:]]
+    run("snapshot", [size for size in sizes if size <= 10000])
+    run("journal", sizes)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+""" Benchmark of User.load_from_file() startup time and peak RSS
+Each measure runs in its own process: bench_load.py [size ...]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import uuid
+
+from models.base import DATA
+from models.user import User
+
+MODES = ("json.load", "eager", "lazy")
+
+
+def write_snapshot(size: int):
+    """ Write a .db_User.json snapshot holding size users
+    """
+    with open(".db_User.json", "w") as f:
+        f.write("{")
+        for i in range(size):
+            obj_id = str(uuid.uuid4())
+            f.write("{}{}: {}".format("," if i else "", json.dumps(obj_id),
+                                      json.dumps({
+                                          "id": obj_id,
+                                          "created_at": "2024-06-07T09:25:28",
+                                          "updated_at": "2024-06-07T09:25:28",
+                                          "email": "{}@hbtn.io".format(i),
+                                          "_password": "0" * 64,
+                                          "first_name": None,
+                                          "last_name": None})))
+        f.write("}")
+
+
+def measure(mode: str):
+    """ Load the snapshot and print the time taken and the peak RSS
+    """
+    start = time.perf_counter()
+    if mode == "json.load":
+        DATA["User"] = {}
+        with open(".db_User.json") as f:
+            for obj_id, obj_json in json.load(f).items():
+                DATA["User"][obj_id] = User(**obj_json)
+    else:
+        User.LOAD_MODE = mode
+        User.load_from_file()
+    seconds = time.perf_counter() - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+    print("{:<9} {:>8} users: {:.2f}s, peak RSS {} MiB".format(
+        mode, User.count(), seconds, rss))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--measure":
+        measure(sys.argv[2])
+        sys.exit(0)
+    for size in [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]:
+        write_snapshot(size)
+        for mode in MODES:
+            subprocess.run([sys.executable, __file__, "--measure", mode],
+                           check=True)
+    os.remove(".db_User.json")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+""" Benchmark of the memory held per User with tracemalloc, fields
+included, as loaded from a JSON snapshot, then once its timestamps have
+been read
+"""
+import gc
+import json
+import sys
+import tracemalloc
+import uuid
+
+from models.user import User
+
+
+def snapshot(size: int) -> str:
+    """ Return a JSON list of size users
+    """
+    return json.dumps([{
+        "id": str(uuid.uuid4()),
+        "created_at": "2024-06-07T09:25:28",
+        "updated_at": "2024-06-07T09:25:28",
+        "email": "{}@hbtn.io".format(i),
+        "_password": "0" * 64,
+        "first_name": "Bob",
+        "last_name": None} for i in range(size)])
+
+
+def touch(users: list):
+    """ Read the timestamps of every user
+    """
+    for user in users:
+        user.created_at
+        user.updated_at
+
+
+def measure(label: str, size: int, function, *args):
+    """ Print the bytes still allocated per user after function(*args)
+    """
+    gc.collect()
+    start = tracemalloc.get_traced_memory()[0]
+    result = function(*args)
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0] - start
+    print("{:<12} {} bytes per user".format(label, allocated // size))
+    return result
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = snapshot(size)
+    tracemalloc.start()
+    users = measure("loaded", size,
+                    lambda: [User(**obj) for obj in json.loads(text)])
+    measure("+ timestamps", size, touch, users)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+""" Benchmark of startup time, peak RSS and get() latency of User stored
+in a JSON snapshot versus the memory-mapped record store
+Each measure runs in its own process: bench_mmap.py [size ...]
+"""
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from models.base import DATA
+from models.user import User
+
+MODES = ("snapshot", "mmap")
+FILES = (".db_User.json", ".db_User.rec", ".db_User.idx")
+READS = 10000
+
+
+def clean():
+    """ Remove the storage files of every mode
+    """
+    for file_path in FILES:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def populate(size: int):
+    """ Write size users to the storage files of every mode
+    """
+    clean()
+    for mode in MODES:
+        User.STORAGE_MODE = mode
+        User.load_from_file()
+        with User.batch():
+            for i in range(size):
+                user = User(email="{}@hbtn.io".format(i), first_name="Bob")
+                user.password = "H0lbertonSchool98!"
+                DATA["User"][user.id] = user
+        User.save_to_file()
+
+
+def measure(mode: str):
+    """ Open the store, then print the time taken, the average get() time
+    and the peak RSS
+    """
+    User.STORAGE_MODE = mode
+    start = time.perf_counter()
+    User.load_from_file()
+    opened = time.perf_counter() - start
+    ids = random.sample(list(DATA["User"]), min(READS, User.count()))
+    start = time.perf_counter()
+    for obj_id in ids:
+        User.get(obj_id)
+    read = (time.perf_counter() - start) / len(ids)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+    print("{:<8} {:>8} users: open {:.2f}s, get {:.1f}us, "
+          "peak RSS {} MiB".format(mode, User.count(), opened, read * 1e6,
+                                   rss))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--measure":
+        measure(sys.argv[2])
+        sys.exit(0)
+    for size in [int(arg) for arg in sys.argv[1:]] or [100000]:
+        populate(size)
+        for mode in MODES:
+            subprocess.run([sys.executable, __file__, "--measure", mode],
+                           check=True)
+    clean()
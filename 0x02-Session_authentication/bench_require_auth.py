@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+""" Benchmark of Auth.require_auth() by number of excluded paths, with
+the former startswith() loop and with a compiled PathMatcher
+"""
+import sys
+import timeit
+
+from api.v1.auth.auth import Auth, PathMatcher
+
+PATHS = ["/api/v1/users/42", "/api/v1/status/", "/api/v1/stats"]
+
+
+def loop_require_auth(path: str, excluded_paths: list) -> bool:
+    """ require_auth() as a startswith() loop over excluded paths
+    """
+    if path in excluded_paths:
+        return False
+    for excluded in excluded_paths:
+        if excluded.startswith(path) or path.startswith(excluded):
+            return False
+        if excluded[-1] == "*" and path.startswith(excluded[:-1]):
+            return False
+    return True
+
+
+def excluded_paths(size: int) -> list:
+    """ Return size excluded paths, a quarter of them wildcards
+    """
+    paths = ['/api/v1/status/', '/api/v1/unauthorized/', '/api/v1/forbidden/']
+    for i in range(size - len(paths)):
+        paths.append("/api/v1/public/{}{}".format(i, "*" if i % 4 else "/"))
+    return paths[:size]
+
+
+if __name__ == "__main__":
+    auth = Auth()
+    number = 20000
+    for size in [int(arg) for arg in sys.argv[1:]] or [3, 100, 1000, 5000]:
+        paths = excluded_paths(size)
+        matcher = PathMatcher(paths)
+        loop = timeit.timeit(lambda: [loop_require_auth(path, paths)
+                                      for path in PATHS], number=number)
+        compiled = timeit.timeit(lambda: [auth.require_auth(path, matcher)
+                                          for path in PATHS], number=number)
+        print("{:>5} excluded paths: loop {:.2f}us, compiled {:.2f}us"
+              " per request".format(size, loop / number / len(PATHS) * 1e6,
+                                    compiled / number / len(PATHS) * 1e6))
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+""" Benchmark of snapshot size, save time and load time per serializer
+"""
+import os
+import sys
+import time
+
+from models.base import DATA
+from models.serializer import SERIALIZERS
+from models.user import User
+
+
+def populate(size: int):
+    """ Fill the User store with size users
+    """
+    User.load_from_file()
+    for i in range(size):
+        user = User(email="{}@hbtn.io".format(i), first_name="Bob")
+        user.password = "H0lbertonSchool98!"
+        DATA["User"][user.id] = user
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name in SERIALIZERS:
+        populate(size)
+        User.SERIALIZER = name
+        start = time.perf_counter()
+        User.save_to_file()
+        saved = time.perf_counter() - start
+        file_path = User._snapshot_path(name)
+        start = time.perf_counter()
+        User.load_from_file()
+        loaded = time.perf_counter() - start
+        print("{:<6} {} users: {:.1f} MiB, save {:.2f}s, load {:.2f}s".format(
+            name, User.count(), os.path.getsize(file_path) / (1 << 20),
+            saved, loaded))
+        os.remove(file_path)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+""" Benchmark of SessionDBAuth login throughput, with sessions written
+behind by UserSession, and with each login saved synchronously to the
+journal or to the JSON snapshot
+Each mode runs in its own process: bench_session_db.py [logins]
+"""
+import glob
+import os
+import subprocess
+import sys
+import time
+
+MODES = {
+    "snapshot": ("snapshot", 0, 0.0),
+    "journal": ("journal", 0, 0.0),
+    "write-behind": ("journal", None, None),
+}
+
+
+def measure(mode: str, logins: int):
+    """ Create logins sessions and print the login throughput, then the
+    lookup latency through an empty cache and from the cache
+    """
+    from api.v1.auth.session_db_auth import SessionDBAuth
+    from models.user_session import UserSession
+
+    storage_mode, count, interval = MODES[mode]
+    UserSession.STORAGE_MODE = storage_mode
+    if count is not None:
+        UserSession.GROUP_COMMIT_COUNT = count
+        UserSession.GROUP_COMMIT_INTERVAL = interval
+    auth = SessionDBAuth()
+    start = time.perf_counter()
+    session_ids = [auth.create_session("user-{}".format(i))
+                   for i in range(logins)]
+    UserSession.commit()
+    seconds = time.perf_counter() - start
+    auth.clear_caches()
+    start = time.perf_counter()
+    for session_id in session_ids:
+        auth.user_id_for_session_id(session_id)
+    missed = time.perf_counter() - start
+    start = time.perf_counter()
+    for session_id in session_ids:
+        auth.user_id_for_session_id(session_id)
+    cached = time.perf_counter() - start
+    print("{:<12} {} logins: {:>7.0f} logins/s, lookup {:.1f}us read"
+          " through, {:.1f}us cached".format(
+              mode, logins, logins / seconds, missed / logins * 1e6,
+              cached / logins * 1e6))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], int(sys.argv[3]))
+        sys.exit(0)
+    logins = sys.argv[1] if len(sys.argv) > 1 else "2000"
+    for mode in MODES:
+        subprocess.run([sys.executable, __file__, "--measure", mode, logins],
+                       check=True)
+        for file_path in glob.glob(".db_UserSession.*"):
+            os.remove(file_path)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+""" Benchmark of SessionStore with live sessions: lookup latency, and the
+cost of sweeping expired sessions through the timing wheel compared with
+a full scan of the store
+bench_sessions.py [size] [duration]
+"""
+import random
+import sys
+import time
+import uuid
+
+from api.v1.auth.session_auth import SessionStore
+
+
+class Clock:
+    """ Clock moved forward by hand
+    """
+
+    def __init__(self):
+        """ Start at the current time
+        """
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        """ Return the current time
+        """
+        return self.now
+
+
+def fill(store: SessionStore, clock: Clock, size: int,
+         duration: float) -> list:
+    """ Create size sessions over duration seconds and return their ids
+    """
+    session_ids = []
+    step = duration / size
+    start = time.perf_counter()
+    for i in range(size):
+        session_id = str(uuid.UUID(int=random.getrandbits(128), version=4))
+        store.put(session_id, "user-{}".format(i % 1000))
+        session_ids.append(session_id)
+        clock.now += step
+    seconds = time.perf_counter() - start
+    print("put:    {} sessions in {:.2f}s, {:.2f}us per session".format(
+        size, seconds, seconds / size * 1e6))
+    return session_ids
+
+
+def lookups(store: SessionStore, session_ids: list, number: int = 200000):
+    """ Print the mean and 99th percentile latency of store.get() over
+    number live and missing sessions
+    """
+    sample = random.sample(session_ids, number // 2)
+    sample += [str(uuid.uuid4()) for _ in range(number // 2)]
+    random.shuffle(sample)
+    latencies = []
+    start = time.perf_counter()
+    for session_id in sample:
+        before = time.perf_counter()
+        store.get(session_id)
+        latencies.append(time.perf_counter() - before)
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    print("get:    {:.2f}us per lookup, p99 {:.2f}us, {} sessions".format(
+        seconds / number * 1e6, latencies[number * 99 // 100] * 1e6,
+        len(store)))
+
+
+def sweep(store: SessionStore, clock: Clock, seconds: float):
+    """ Move the clock seconds forward and sweep the expired sessions in
+    calls of SWEEP_BATCH, then time a full scan of what is left
+    """
+    clock.now += seconds
+    calls = 0
+    removed = 0
+    worst = 0.0
+    start = time.perf_counter()
+    while True:
+        before = time.perf_counter()
+        count = store.sweep()
+        worst = max(worst, time.perf_counter() - before)
+        if not count:
+            break
+        calls += 1
+        removed += count
+    total = time.perf_counter() - start
+    print("sweep:  {} expired in {} calls, {:.2f}s, {:.2f}ms per call at"
+          " worst, {} sessions left".format(removed, calls, total,
+                                            worst * 1e3, len(store)))
+    now = clock()
+    start = time.perf_counter()
+    live = {session_id: entry
+            for session_id, entry in store._sessions.items()
+            if entry[1] > now}
+    print("scan:   {:.2f}s for one full scan of {} sessions".format(
+        time.perf_counter() - start, len(live)))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 3600.0
+    clock = Clock()
+    store = SessionStore(duration)
+    store.clock = clock
+    store._tick = store._tick_of(clock())
+    session_ids = fill(store, clock, size, duration / 2)
+    lookups(store, session_ids)
+    sweep(store, clock, duration * 3 / 4)
+    lookups(store, session_ids)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+""" Benchmark of concurrent User.save() from several processes sharing
+the storage files, checking that no write is lost, and that the cached
+GET /api/v1/users body of a process shows the users others saved
+bench_shared.py [workers] [saves per worker]
+"""
+import os
+import sys
+import time
+from multiprocessing import Barrier, Process
+
+from models.user import User
+
+MODES = ("snapshot", "journal", "mmap")
+
+
+def clean():
+    """ Remove the storage files of User
+    """
+    for file_path in os.listdir("."):
+        if file_path.startswith(".db_User."):
+            os.remove(file_path)
+
+
+def worker(mode: str, number: int, saves: int, barrier):
+    """ Save users, then remove a fifth of them
+    """
+    User.STORAGE_MODE = mode
+    User.SHARED_STORAGE = True
+    User.load_from_file()
+    barrier.wait()
+    obj_ids = []
+    for i in range(saves):
+        user = User(email="{}-{}@hbtn.io".format(number, i))
+        user.save()
+        obj_ids.append(user.id)
+    for obj_id in obj_ids[::5]:
+        User.get(obj_id).remove()
+
+
+def saver(mode: str):
+    """ Save one user
+    """
+    User.STORAGE_MODE = mode
+    User.SHARED_STORAGE = True
+    User.load_from_file()
+    User(email="other@hbtn.io").save()
+
+
+def check_users_body(mode: str):
+    """ Cache the GET /api/v1/users body, save a user from another process,
+    and check the next body has it
+    """
+    from api.v1.app import app
+
+    clean()
+    User.STORAGE_MODE = mode
+    User.SHARED_STORAGE = True
+    User.load_from_file()
+    client = app.test_client()
+    before = len(client.get("/api/v1/users").get_json())
+    process = Process(target=saver, args=(mode,))
+    process.start()
+    process.join()
+    after = len(client.get("/api/v1/users").get_json())
+    assert (before, after) == (0, 1), \
+        "{}: {} users before, {} after".format(mode, before, after)
+    print("{:<8} GET /api/v1/users: {} users, then {}".format(
+        mode, before, after))
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    saves = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    for mode in MODES:
+        clean()
+        barrier = Barrier(workers)
+        processes = [Process(target=worker,
+                             args=(mode, number, saves, barrier))
+                     for number in range(workers)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        seconds = time.perf_counter() - start
+        User.STORAGE_MODE = mode
+        User.SHARED_STORAGE = True
+        User.load_from_file()
+        print("{:<8} {} workers: {} users, {} expected, {:.2f}s".format(
+            mode, workers, User.count(), workers * (saves - len(
+                range(0, saves, 5))), seconds))
+    for mode in MODES:
+        check_users_body(mode)
+    clean()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+""" Benchmark of User.to_json() and of GET /api/v1/users
+"""
+import json
+import sys
+import time
+
+from api.v1 import encoder
+from api.v1.app import app
+from models.base import DATA
+from models.user import User
+
+
+def populate(size: int):
+    """ Fill the User store with size users, as loaded from a snapshot
+    """
+    User.load_from_file()
+    for i in range(size):
+        user = User(email="{}@hbtn.io".format(i), first_name="Bob",
+                    created_at="2024-06-07T09:25:28",
+                    updated_at="2024-06-07T09:25:28")
+        user.password = "H0lbertonSchool98!"
+        DATA["User"][user.id] = user
+
+
+def timed(label: str, size: int, function, *args):
+    """ Print the time taken by function(*args) and return its result
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    print("{:>7} users {:<22} {:.3f}s".format(size, label,
+                                               time.perf_counter() - start))
+    return result
+
+
+def to_json_all(users: list) -> list:
+    """ Return the JSON dictionaries of users
+    """
+    return [user.to_json() for user in users]
+
+
+def parse_timestamps(users: list):
+    """ Read the datetimes of every user
+    """
+    for user in users:
+        user.created_at
+        user.updated_at
+
+
+if __name__ == "__main__":
+    client = app.test_client()
+    for size in [int(arg) for arg in sys.argv[1:]] or [10000, 100000]:
+        populate(size)
+        users = User.all()
+        timed("to_json (loaded)", size, to_json_all, users)
+        parse_timestamps(users)
+        objs_json = timed("to_json (datetimes)", size, to_json_all, users)
+        timed("json.dumps", size, json.dumps, objs_json)
+        if encoder.orjson is not None:
+            timed("orjson.dumps", size, encoder.dumps, objs_json)
+        User._changed()
+        timed("GET /users", size, client.get, "/api/v1/users")
+        timed("GET /users (cached)", size, client.get, "/api/v1/users")
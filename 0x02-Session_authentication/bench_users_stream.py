@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+""" Benchmark of time to first byte of GET /api/v1/users, in full,
+paginated and streamed
+"""
+import sys
+import time
+
+from api.v1.app import app
+from models.base import DATA
+from models.user import User
+
+
+def populate(size: int):
+    """ Fill the User store with size users
+    """
+    User.load_from_file()
+    for i in range(size):
+        user = User(email="{}@hbtn.io".format(i), first_name="Bob",
+                    created_at="2024-06-07T09:25:28",
+                    updated_at="2024-06-07T09:25:28")
+        DATA["User"][user.id] = user
+    User._changed()
+
+
+def first_byte(client, url: str) -> float:
+    """ Return the time taken to get the first body chunk of url
+    """
+    start = time.perf_counter()
+    response = client.get(url, buffered=False)
+    next(iter(response.response))
+    seconds = time.perf_counter() - start
+    response.close()
+    return seconds
+
+
+if __name__ == "__main__":
+    client = app.test_client()
+    for size in [int(arg) for arg in sys.argv[1:]] or [10000, 100000]:
+        populate(size)
+        start = time.perf_counter()
+        User._order()
+        print("{:>7} users sort once             {:.3f}s".format(
+            size, time.perf_counter() - start))
+        for url in ("/api/v1/users", "/api/v1/users?limit=100",
+                    "/api/v1/users?stream=array",
+                    "/api/v1/users?stream=ndjson"):
+            print("{:>7} users {:<27} {:.4f}s".format(
+                size, url[8:], first_byte(client, url)))
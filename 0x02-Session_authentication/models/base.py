@@ -1,39 +1,136 @@
 #!/usr/bin/env python3
 """ Base module
 """
+from contextlib import contextmanager
 from datetime import datetime
-from typing import TypeVar, List, Iterable
+from typing import TypeVar, List, Iterable, Iterator, Tuple
 from os import path
+import atexit
+import fcntl
+import itertools
 import json
+import operator
+import os
+import sys
+import threading
+import time
 import uuid
 
+from models.mmap_store import MmapStore
+from models.serializer import SERIALIZERS, TIMESTAMP_FIELDS, \
+    TIMESTAMP_FORMAT, detect, to_datetime
+
 
-TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
 DATA = {}
+INDEXES = {}
+INDEXED_VALUES = {}
+JOURNALS = {}
+JOURNAL_SIZES = {}
+BATCHES = {}
+PENDING = {}
+GROUP_TIMERS = {}
+LAST_FSYNC = {}
+FSYNC_TIMERS = {}
+GENERATIONS = {}
+ORDERS = {}
+JOURNAL_OFFSETS = {}
+STAMPS = {}
+LAST_REFRESH = {}
+LOCK_FILES = {}
+LOCK_STATES = {}
+GENERATION_COUNTER = itertools.count(1)
+STORAGE_LOCK = threading.RLock()
+
+
+class Timestamp():
+    """ Timestamp attribute kept in a slot as it was given, a datetime or
+    a TIMESTAMP_FORMAT string, and only parsed on its first read
+    Its string form is cached in the _<name>_iso slot until it is set
+    """
+
+    def __set_name__(self, owner, name: str):
+        """ Bind to the _<name> and _<name>_iso slots of the owner class
+        """
+        self.slot = owner.__dict__["_" + name]
+        self.iso_slot = owner.__dict__["_{}_iso".format(name)]
+
+    def __get__(self, obj, owner=None) -> datetime:
+        """ Return the timestamp as a datetime, parsing it once
+        """
+        if obj is None:
+            return self
+        value = self.slot.__get__(obj, owner)
+        if type(value) is not datetime and value is not None:
+            if type(value) is str:
+                self.iso_slot.__set__(obj, value)
+            value = to_datetime(value)
+            self.slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        """ Store a datetime or a TIMESTAMP_FORMAT string
+        """
+        self.slot.__set__(obj, value)
+        self.iso_slot.__set__(obj, None)
+
+    def iso(self, obj) -> str:
+        """ Return the timestamp as a TIMESTAMP_FORMAT string, formatting
+        it once
+        """
+        value = self.slot.__get__(obj)
+        if type(value) is not datetime:
+            return value
+        iso = self.iso_slot.__get__(obj)
+        if iso is None:
+            iso = value.strftime(TIMESTAMP_FORMAT)
+            self.iso_slot.__set__(obj, iso)
+        return iso
 
 
 class Base():
     """ Base class
+    Fields are declared in __slots__ so instances carry no __dict__;
+    subclasses list their own fields the same way
     """
 
+    __slots__ = ("id", "_created_at", "_updated_at", "_created_at_iso",
+                 "_updated_at_iso")
+    created_at = Timestamp()
+    updated_at = Timestamp()
+
+    INDEXED_ATTRIBUTES = ()
+    LOAD_MODE = "eager"
+    SERIALIZER = "json"
+    STORAGE_MODE = "snapshot"
+    JOURNAL_COMPACT_THRESHOLD = 1000
+    FSYNC_POLICY = "never"
+    FSYNC_INTERVAL = 1.0
+    GROUP_COMMIT_COUNT = 0
+    GROUP_COMMIT_INTERVAL = 0.0
+    ORDER_CHUNK = 100
+    SHARED_STORAGE = False
+    REFRESH_INTERVAL = 0.0
+
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
         """
         s_class = str(self.__class__.__name__)
         if DATA.get(s_class) is None:
-            DATA[s_class] = {}
+            DATA[s_class] = self.__class__._new_store()
+            self.__class__._reset_indexes()
 
         self.id = kwargs.get('id', str(uuid.uuid4()))
         if kwargs.get('created_at') is not None:
-            self.created_at = datetime.strptime(kwargs.get('created_at'),
-                                                TIMESTAMP_FORMAT)
+            self.created_at = kwargs.get('created_at')
         else:
             self.created_at = datetime.utcnow()
         if kwargs.get('updated_at') is not None:
-            self.updated_at = datetime.strptime(kwargs.get('updated_at'),
-                                                TIMESTAMP_FORMAT)
+            self.updated_at = kwargs.get('updated_at')
         else:
             self.updated_at = datetime.utcnow()
+        if type(self._updated_at) is str and \
+                self._updated_at == self._created_at:
+            self._updated_at = self._created_at
 
     def __eq__(self, other: TypeVar('Base')) -> bool:
         """ Equality
@@ -44,11 +141,66 @@ class Base():
             return False
         return (self.id == other.id)
 
+    @classmethod
+    def _fields(cls) -> tuple:
+        """ Return the field names declared in the __slots__ of the class
+        and its parents, timestamps under their attribute name
+        """
+        fields = cls.__dict__.get("_FIELDS")
+        if fields is None:
+            fields = []
+            for klass in reversed(cls.__mro__):
+                for name in klass.__dict__.get("__slots__", ()):
+                    if name[1:] in TIMESTAMP_FIELDS:
+                        name = name[1:]
+                    elif name[1:-4] in TIMESTAMP_FIELDS or \
+                            name in ("__dict__", "__weakref__"):
+                        continue
+                    fields.append(name)
+            fields = tuple(fields)
+            cls._FIELDS = fields
+        return fields
+
+    @classmethod
+    def _plan(cls, for_serialization: bool) -> tuple:
+        """ Return the (key, reader) pairs to_json() uses for the class,
+        built once per class: timestamps are read as cached strings and
+        private fields only kept for serialization
+        """
+        plans = cls.__dict__.get("_PLANS")
+        if plans is None:
+            plans = {}
+            for private in (False, True):
+                plan = []
+                for key in cls._fields():
+                    if not private and key[0] == '_':
+                        continue
+                    attr = getattr(cls, key, None)
+                    if isinstance(attr, Timestamp):
+                        plan.append((key, attr.iso))
+                    else:
+                        plan.append((key, operator.attrgetter(key)))
+                plans[private] = tuple(plan)
+            cls._PLANS = plans
+        return plans[for_serialization]
+
+    def to_dict(self) -> dict:
+        """ Return the fields of the object, timestamps as datetimes
+        """
+        result = {key: getattr(self, key) for key in self._fields()}
+        result.update(getattr(self, "__dict__", {}))
+        return result
+
     def to_json(self, for_serialization: bool = False) -> dict:
         """ Convert the object a JSON dictionary
         """
         result = {}
-        for key, value in self.__dict__.items():
+        for key, read in self._plan(for_serialization):
+            value = read(self)
+            if type(value) is datetime:
+                value = value.strftime(TIMESTAMP_FORMAT)
+            result[key] = value
+        for key, value in getattr(self, "__dict__", {}).items():
             if not for_serialization and key[0] == '_':
                 continue
             if type(value) is datetime:
@@ -57,55 +209,673 @@ class Base():
                 result[key] = value
         return result
 
+    @classmethod
+    def _reset_indexes(cls):
+        """ Empty the indexes of INDEXED_ATTRIBUTES
+        """
+        s_class = cls.__name__
+        INDEXES[s_class] = {attr: {} for attr in cls.INDEXED_ATTRIBUTES}
+        INDEXED_VALUES[s_class] = {}
+
+    @classmethod
+    def _indexes(cls) -> dict:
+        """ Return the indexes of the class, building them first if they
+        were deferred by load_from_file()
+        """
+        s_class = cls.__name__
+        if INDEXES[s_class] is None:
+            with STORAGE_LOCK:
+                if INDEXES[s_class] is None:
+                    cls._reset_indexes()
+                    for obj_id, obj in DATA[s_class].items():
+                        cls._index(obj_id, obj)
+        return INDEXES[s_class]
+
+    @classmethod
+    def _index(cls, obj_id: str, obj):
+        """ Index an object, or its JSON dictionary when not materialized,
+        under its INDEXED_ATTRIBUTES values
+        """
+        s_class = cls.__name__
+        cls._unindex(obj_id)
+        values = {}
+        for attr, index in cls._indexes().items():
+            if type(obj) is dict:
+                value = obj.get(attr)
+            else:
+                value = getattr(obj, attr, None)
+            try:
+                index.setdefault(value, {})[obj_id] = True
+            except TypeError:
+                continue
+            values[attr] = value
+        INDEXED_VALUES[s_class][obj_id] = values
+
+    @classmethod
+    def _unindex(cls, obj_id: str):
+        """ Remove an object from the indexes
+        """
+        s_class = cls.__name__
+        indexes = cls._indexes()
+        values = INDEXED_VALUES[s_class].pop(obj_id, {})
+        for attr, value in values.items():
+            bucket = indexes[attr].get(value)
+            if bucket is not None:
+                bucket.pop(obj_id, None)
+                if not bucket:
+                    del indexes[attr][value]
+
+    @classmethod
+    def _order_key(cls, obj_id: str) -> Tuple[str, str]:
+        """ Return the (created_at, id) sort key of an object, created_at
+        as a TIMESTAMP_FORMAT string so it is never parsed
+        """
+        obj = DATA[cls.__name__][obj_id]
+        if type(obj) is dict:
+            created_at = obj.get("created_at")
+        else:
+            created_at = Base.created_at.iso(obj)
+        if type(created_at) is datetime:
+            created_at = created_at.strftime(TIMESTAMP_FORMAT)
+        return (created_at or "", obj_id)
+
+    @classmethod
+    def _order(cls) -> list:
+        """ Return the IDs of the class sorted by (created_at, id), sorting
+        them on first use then keeping them sorted on save() and remove()
+        created_at is not expected to change once an object is saved
+        """
+        s_class = cls.__name__
+        order = ORDERS.get(s_class)
+        if order is None:
+            with STORAGE_LOCK:
+                order = ORDERS.get(s_class)
+                if order is None:
+                    order = sorted(DATA[s_class], key=cls._order_key)
+                    ORDERS[s_class] = order
+        return order
+
+    @classmethod
+    def _order_position(cls, order: list, key: Tuple[str, str]) -> int:
+        """ Return the position of the first ID of order sorting after key
+        """
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if key < cls._order_key(order[middle]):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    @classmethod
+    def _order_insert(cls, obj_id: str):
+        """ Insert a new ID in the sorted IDs, if they are in use
+        """
+        order = ORDERS.get(cls.__name__)
+        if order is not None:
+            order.insert(cls._order_position(order, cls._order_key(obj_id)),
+                         obj_id)
+
+    @classmethod
+    def _order_remove(cls, obj_id: str):
+        """ Remove an ID, still stored, from the sorted IDs, if they are in
+        use
+        """
+        order = ORDERS.get(cls.__name__)
+        if order is not None:
+            pos = cls._order_position(order, cls._order_key(obj_id)) - 1
+            if pos >= 0 and order[pos] == obj_id:
+                del order[pos]
+            else:
+                order.remove(obj_id)
+
+    @classmethod
+    def _materialize(cls, obj_id: str) -> TypeVar('Base'):
+        """ Return the object with this ID, building the instance from its
+        JSON dictionary if it was loaded lazily
+        """
+        s_class = cls.__name__
+        obj = DATA[s_class].get(obj_id)
+        if type(obj) is dict:
+            with STORAGE_LOCK:
+                obj = DATA[s_class].get(obj_id)
+                if type(obj) is dict:
+                    obj = cls(**obj)
+                    DATA[s_class][obj_id] = obj
+        return obj
+
     @classmethod
     def load_from_file(cls):
-        """ Load all objects from file
+        """ Load all objects from file, then replay the journal over them
+        The snapshot is parsed one object at a time. With LOAD_MODE
+        "lazy", objects are kept as JSON dictionaries and only built on
+        their first get() or search() hit
+        With STORAGE_MODE "mmap", nothing is read until used, and the
+        indexes are only built on the first save(), remove() or search()
+        """
+        s_class = cls.__name__
+        with cls._file_lock(exclusive=False):
+            DATA[s_class] = cls._new_store()
+            ORDERS.pop(s_class, None)
+            cls._changed()
+            cls._reset_indexes()
+            cls._close_journal()
+            if cls.STORAGE_MODE == "mmap":
+                if cls.INDEXED_ATTRIBUTES:
+                    INDEXES[s_class] = None
+                return
+            STAMPS[s_class] = cls._stamp()
+            file_path = cls._snapshot_path()
+            if file_path is not None:
+                with open(file_path, 'rb') as f:
+                    for obj_json in detect(f).load(f):
+                        cls._load_json(obj_json)
+            cls._replay_journal()
+
+    @classmethod
+    @contextmanager
+    def _file_lock(cls, exclusive: bool = True):
+        """ Hold the .db_<Class>.lock file lock with SHARED_STORAGE set,
+        exclusive to write the storage files and shared to read them
+        It is reentrant, a shared lock being made exclusive as needed.
+        The lock file is opened again in forked processes, since flock()
+        locks are shared by the copies of a file descriptor
+        """
+        if not cls.SHARED_STORAGE:
+            yield
+            return
+        s_class = cls.__name__
+        with STORAGE_LOCK:
+            pid, lock_file = LOCK_FILES.get(s_class, (None, None))
+            if pid != os.getpid():
+                LOCK_STATES.pop(s_class, None)
+                lock_file = open(".db_{}.lock".format(s_class), 'a')
+                LOCK_FILES[s_class] = (os.getpid(), lock_file)
+            state = LOCK_STATES.get(s_class)
+            if state is None or (exclusive and state == fcntl.LOCK_SH):
+                mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                fcntl.flock(lock_file, mode)
+                LOCK_STATES[s_class] = mode
+            try:
+                yield
+            finally:
+                if state is None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    del LOCK_STATES[s_class]
+                elif state != LOCK_STATES[s_class]:
+                    fcntl.flock(lock_file, state)
+                    LOCK_STATES[s_class] = state
+
+    @classmethod
+    def _stamp(cls) -> tuple:
+        """ Return the path, inode, modification time and size of the
+        snapshot, which change whenever a process writes it
+        """
+        names = [cls.SERIALIZER] + \
+            [name for name in SERIALIZERS if name != cls.SERIALIZER]
+        for name in names:
+            file_path = cls._snapshot_path(name)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            return (file_path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        return None
+
+    @classmethod
+    def _journal_size(cls) -> int:
+        """ Return the size of the journal file in bytes
+        """
+        try:
+            return os.stat(".db_{}.journal".format(cls.__name__)).st_size
+        except FileNotFoundError:
+            return 0
+
+    @classmethod
+    def refresh(cls):
+        """ Apply the changes other processes made to the storage files
+        With SHARED_STORAGE set, it runs before get(), search(), count()
+        and ordered(), at most every REFRESH_INTERVAL seconds, and costs
+        a stat() when nothing changed. A replaced snapshot is reloaded,
+        journal records are replayed from the last one read, and record
+        store entries are re-indexed from the last one read
+        """
+        if not cls.SHARED_STORAGE:
+            return
+        s_class = cls.__name__
+        now = time.monotonic()
+        if cls.REFRESH_INTERVAL and \
+                now - LAST_REFRESH.get(s_class, 0) < cls.REFRESH_INTERVAL:
+            return
+        LAST_REFRESH[s_class] = now
+        if cls.STORAGE_MODE == "mmap":
+            if not DATA[s_class].changed():
+                return
+        elif cls._stamp() == STAMPS.get(s_class) and \
+                (cls.STORAGE_MODE != "journal" or
+                 cls._journal_size() == JOURNAL_OFFSETS.get(s_class, 0)):
+            return
+        with cls._file_lock(exclusive=False):
+            if cls._catch_up():
+                cls._changed()
+
+    @classmethod
+    def _catch_up(cls) -> set:
+        """ Apply the changes other processes wrote since this one last
+        read or wrote the storage files, with the file lock held
+        Return the IDs they touched, or None if everything was reloaded
+        """
+        s_class = cls.__name__
+        if cls.STORAGE_MODE == "mmap":
+            reset, obj_ids = DATA[s_class].poll()
+            if reset:
+                if cls.INDEXED_ATTRIBUTES:
+                    INDEXES[s_class] = None
+                ORDERS.pop(s_class, None)
+                cls._changed()
+                return None
+            if INDEXES[s_class]:
+                for obj_id in obj_ids:
+                    cls._unindex(obj_id)
+                    obj = DATA[s_class].get(obj_id)
+                    if obj is not None:
+                        cls._index(obj_id, obj)
+            if obj_ids:
+                ORDERS.pop(s_class, None)
+            return set(obj_ids)
+        if cls._stamp() != STAMPS.get(s_class):
+            cls.load_from_file()
+            return None
+        if cls.STORAGE_MODE == "journal":
+            return cls._tail_journal()
+        return set()
+
+    @classmethod
+    def _new_store(cls):
+        """ Return an empty dictionary to hold the objects of the class, or
+        with STORAGE_MODE "mmap" its memory-mapped record store, whose
+        objects are decoded on each read and never all held in memory
+        """
+        previous = DATA.get(cls.__name__)
+        if isinstance(previous, MmapStore):
+            previous.close()
+        if cls.STORAGE_MODE == "mmap":
+            return MmapStore(cls)
+        return {}
+
+    @classmethod
+    def _snapshot_path(cls, serializer: str = None) -> str:
+        """ Return the snapshot file of a serializer, or when none is
+        given the existing snapshot, preferring the SERIALIZER one
+        """
+        s_class = cls.__name__
+        if serializer is not None:
+            extension = SERIALIZERS[serializer].extension
+            return ".db_{}.{}".format(s_class, extension)
+        names = [cls.SERIALIZER] + \
+            [name for name in SERIALIZERS if name != cls.SERIALIZER]
+        for name in names:
+            file_path = cls._snapshot_path(name)
+            if path.exists(file_path):
+                return file_path
+        return None
+
+    @classmethod
+    def _load_json(cls, obj_json: dict):
+        """ Store and index an object read from storage
+        """
+        s_class = cls.__name__
+        if cls.LOAD_MODE == "lazy":
+            obj = {sys.intern(k): v for k, v in obj_json.items()}
+        else:
+            obj = cls(**obj_json)
+        DATA[s_class][obj_json["id"]] = obj
+        cls._index(obj_json["id"], obj)
+
+    @classmethod
+    def _replay_journal(cls):
+        """ Apply the journal records written since the last snapshot
+        A torn last record, left by an interrupted write, is cut off
         """
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        DATA[s_class] = {}
-        if not path.exists(file_path):
+        journal_path = ".db_{}.journal".format(s_class)
+        JOURNAL_SIZES[s_class] = 0
+        JOURNAL_OFFSETS[s_class] = 0
+        if not path.exists(journal_path):
             return
 
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+        with open(journal_path, 'rb+') as f:
+            offset = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("Torn journal record")
+                    record = json.loads(line)
+                except ValueError:
+                    f.truncate(offset)
+                    break
+                offset += len(line)
+                JOURNAL_SIZES[s_class] += 1
+                cls._apply(record)
+        JOURNAL_OFFSETS[s_class] = offset
+
+    @classmethod
+    def _tail_journal(cls) -> set:
+        """ Apply the journal records appended since the last one read,
+        and return the IDs they touched
+        """
+        s_class = cls.__name__
+        journal_path = ".db_{}.journal".format(s_class)
+        offset = JOURNAL_OFFSETS.get(s_class, 0)
+        size = cls._journal_size()
+        if size == offset:
+            return set()
+        if size < offset:
+            cls.load_from_file()
+            return None
+        obj_ids = set()
+        with open(journal_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                JOURNAL_SIZES[s_class] = JOURNAL_SIZES.get(s_class, 0) + 1
+                obj_ids.add(cls._apply(json.loads(line)))
+        JOURNAL_OFFSETS[s_class] = offset
+        return obj_ids
+
+    @classmethod
+    def _apply(cls, record: dict) -> str:
+        """ Apply a mutation record to the objects and return its ID
+        """
+        s_class = cls.__name__
+        if record["op"] == "upsert":
+            obj_id = record["obj"]["id"]
+            is_new = obj_id not in DATA[s_class]
+            cls._load_json(record["obj"])
+            if is_new:
+                cls._order_insert(obj_id)
+        else:
+            obj_id = record["id"]
+            if obj_id in DATA[s_class]:
+                cls._order_remove(obj_id)
+                del DATA[s_class][obj_id]
+                cls._unindex(obj_id)
+        return obj_id
+
+    @classmethod
+    def _close_journal(cls):
+        """ Close the journal file of the class if it is open
+        """
+        journal = JOURNALS.pop(cls.__name__, None)
+        if journal is not None:
+            journal.close()
+
+    @classmethod
+    def _append_journal(cls, records: List[dict]):
+        """ Append mutation records to the journal in a single write
+        The journal is compacted into a snapshot once it holds more
+        records than both JOURNAL_COMPACT_THRESHOLD and the object count,
+        which keeps writes amortized constant-time
+        """
+        s_class = cls.__name__
+        journal = JOURNALS.get(s_class)
+        if journal is None:
+            journal = open(".db_{}.journal".format(s_class), 'a')
+            JOURNALS[s_class] = journal
+        lines = "".join(json.dumps(r) + "\n" for r in records)
+        journal.write(lines)
+        cls._sync(journal)
+        JOURNAL_OFFSETS[s_class] = JOURNAL_OFFSETS.get(s_class, 0) + \
+            len(lines)
+        JOURNAL_SIZES[s_class] = JOURNAL_SIZES.get(s_class, 0) + len(records)
+        if JOURNAL_SIZES[s_class] > max(cls.JOURNAL_COMPACT_THRESHOLD,
+                                        len(DATA[s_class])):
+            cls.compact()
+
+    @classmethod
+    def compact(cls):
+        """ Write a snapshot of all objects and empty the journal
+        """
+        s_class = cls.__name__
+        with cls._file_lock():
+            cls.save_to_file()
+            cls._close_journal()
+            open(".db_{}.journal".format(s_class), 'w').close()
+            JOURNAL_SIZES[s_class] = 0
+            JOURNAL_OFFSETS[s_class] = 0
+
+    @classmethod
+    def _sync(cls, f):
+        """ Flush a file, and fsync it according to FSYNC_POLICY:
+        "always", "interval" (at most every FSYNC_INTERVAL seconds)
+        or "never"
+        With "interval", a write that is not fsynced right away schedules
+        an fsync of the storage files when the interval ends, so no write
+        stays unsynced longer than FSYNC_INTERVAL
+        """
+        f.flush()
+        if cls.FSYNC_POLICY == "never":
+            return
+        s_class = cls.__name__
+        now = time.monotonic()
+        if cls.FSYNC_POLICY == "interval":
+            wait = LAST_FSYNC.get(s_class, 0) + cls.FSYNC_INTERVAL - now
+            if wait > 0:
+                cls._defer_fsync(wait)
+                return
+        os.fsync(f.fileno())
+        LAST_FSYNC[s_class] = now
+
+    @classmethod
+    def _defer_fsync(cls, wait: float):
+        """ Fsync the storage files in wait seconds, unless an fsync is
+        already scheduled
+        """
+        s_class = cls.__name__
+        with STORAGE_LOCK:
+            if s_class in FSYNC_TIMERS:
+                return
+            timer = threading.Timer(wait, cls._fsync_files)
+            timer.daemon = True
+            FSYNC_TIMERS[s_class] = timer
+            timer.start()
+
+    @classmethod
+    def _fsync_files(cls):
+        """ Fsync the journal and snapshot of the class, or its record
+        store, where the writes an "interval" FSYNC_POLICY held back are
+        """
+        s_class = cls.__name__
+        with STORAGE_LOCK:
+            FSYNC_TIMERS.pop(s_class, None)
+            if cls.STORAGE_MODE == "mmap":
+                store = DATA.get(s_class)
+                if isinstance(store, MmapStore):
+                    store.flush()
+                    os.fsync(store.fileno())
+            else:
+                journal = JOURNALS.get(s_class)
+                if journal is not None:
+                    os.fsync(journal.fileno())
+                file_path = cls._snapshot_path()
+                fd = None
+                if file_path is not None:
+                    try:
+                        fd = os.open(file_path, os.O_RDONLY)
+                    except FileNotFoundError:
+                        pass
+                if fd is not None:
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+            LAST_FSYNC[s_class] = time.monotonic()
 
     @classmethod
     def save_to_file(cls):
-        """ Save all objects to file
+        """ Save all objects to file in the SERIALIZER format
+        The snapshot is written to a temporary file then renamed over the
+        previous one, so readers never see a partial file
+        With STORAGE_MODE "mmap", the record store is compacted instead
+        """
+        s_class = cls.__name__
+        if cls.STORAGE_MODE == "mmap":
+            with STORAGE_LOCK:
+                DATA[s_class].compact()
+            return
+        file_path = cls._snapshot_path(cls.SERIALIZER)
+        tmp_path = "{}.tmp".format(file_path)
+        serializer = SERIALIZERS[cls.SERIALIZER]
+        with cls._file_lock():
+            if serializer.NATIVE_DATETIMES:
+                objs_json = (obj if type(obj) is dict else obj.to_dict()
+                             for obj in DATA[s_class].values())
+            else:
+                objs_json = (obj if type(obj) is dict else obj.to_json(True)
+                             for obj in DATA[s_class].values())
+
+            with open(tmp_path, 'wb') as f:
+                serializer.dump(objs_json, f)
+                cls._sync(f)
+            os.replace(tmp_path, file_path)
+            for name in SERIALIZERS:
+                stale_path = cls._snapshot_path(name)
+                if stale_path != file_path and path.exists(stale_path):
+                    os.remove(stale_path)
+            STAMPS[s_class] = cls._stamp()
+
+    @classmethod
+    def _write(cls, records: List[dict]):
+        """ Persist mutation records with the class STORAGE_MODE
+        With SHARED_STORAGE set, the changes of other processes are
+        applied first, then the records again over them, so no process
+        overwrites the writes of another
+        """
+        if cls.STORAGE_MODE == "mmap":
+            cls._sync(DATA[cls.__name__])
+            return
+        with cls._file_lock():
+            if cls.SHARED_STORAGE:
+                obj_ids = cls._catch_up()
+                if obj_ids is None or obj_ids:
+                    for record in records:
+                        cls._apply(record)
+                    cls._changed()
+            if cls.STORAGE_MODE == "journal":
+                cls._append_journal(records)
+            else:
+                cls.save_to_file()
+
+    @classmethod
+    def _persist(cls, record: dict):
+        """ Persist a mutation record now, or hold it back while a batch
+        is open or group commit is enabled
         """
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        objs_json = {}
-        for obj_id, obj in DATA[s_class].items():
-            objs_json[obj_id] = obj.to_json(True)
+        group_commit = cls.GROUP_COMMIT_COUNT or cls.GROUP_COMMIT_INTERVAL
+        if not BATCHES.get(s_class) and not group_commit:
+            cls._write([record])
+            return
 
-        with open(file_path, 'w') as f:
-            json.dump(objs_json, f)
+        if s_class not in PENDING:
+            PENDING[s_class] = []
+            atexit.register(cls.commit)
+        PENDING[s_class].append(record)
+        if BATCHES.get(s_class):
+            return
+        if cls.GROUP_COMMIT_COUNT and \
+                len(PENDING[s_class]) >= cls.GROUP_COMMIT_COUNT:
+            cls.commit()
+        elif cls.GROUP_COMMIT_INTERVAL and s_class not in GROUP_TIMERS:
+            timer = threading.Timer(cls.GROUP_COMMIT_INTERVAL, cls.commit)
+            timer.daemon = True
+            GROUP_TIMERS[s_class] = timer
+            timer.start()
+
+    @classmethod
+    def commit(cls):
+        """ Persist every mutation held back by a batch or group commit
+        """
+        s_class = cls.__name__
+        with STORAGE_LOCK:
+            timer = GROUP_TIMERS.pop(s_class, None)
+            if timer is not None:
+                timer.cancel()
+            records = PENDING.get(s_class)
+            if records:
+                PENDING[s_class] = []
+                cls._write(records)
+
+    @classmethod
+    @contextmanager
+    def batch(cls):
+        """ Hold back persistence of the class until the block exits,
+        then write all the mutations at once
+        """
+        s_class = cls.__name__
+        with STORAGE_LOCK:
+            BATCHES[s_class] = BATCHES.get(s_class, 0) + 1
+        try:
+            yield
+        finally:
+            with STORAGE_LOCK:
+                BATCHES[s_class] -= 1
+                if BATCHES[s_class] == 0:
+                    cls.commit()
+
+    @classmethod
+    def _changed(cls):
+        """ Give the objects of the class a new generation
+        """
+        GENERATIONS[cls.__name__] = next(GENERATION_COUNTER)
+
+    @classmethod
+    def generation(cls) -> int:
+        """ Return a number that changes whenever an object of the class is
+        saved or removed, or the class is reloaded, to validate caches
+        derived from its objects
+        With SHARED_STORAGE set, the changes of other processes are
+        applied first, so these caches follow them
+        """
+        cls.refresh()
+        return GENERATIONS.get(cls.__name__, 0)
 
     def save(self):
         """ Save current object
         """
         s_class = self.__class__.__name__
-        self.updated_at = datetime.utcnow()
-        DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        with STORAGE_LOCK:
+            self.updated_at = datetime.utcnow()
+            is_new = self.id not in DATA[s_class]
+            DATA[s_class][self.id] = self
+            if is_new:
+                self.__class__._order_insert(self.id)
+            self.__class__._changed()
+            self.__class__._index(self.id, self)
+            self.__class__._persist(
+                {"op": "upsert", "obj": self.to_json(True)})
 
     def remove(self):
         """ Remove object
         """
         s_class = self.__class__.__name__
-        if DATA[s_class].get(self.id) is not None:
-            del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+        with STORAGE_LOCK:
+            if DATA[s_class].get(self.id) is not None:
+                self.__class__._order_remove(self.id)
+                del DATA[s_class][self.id]
+                self.__class__._changed()
+                self.__class__._unindex(self.id)
+                self.__class__._persist({"op": "delete", "id": self.id})
 
     @classmethod
     def count(cls) -> int:
         """ Count all objects
         """
         s_class = cls.__name__
+        cls.refresh()
         return len(DATA[s_class].keys())
 
     @classmethod
@@ -114,18 +884,45 @@ class Base():
         """
         return cls.search()
 
+    @classmethod
+    def ordered(cls, after: Tuple[str, str] = None) \
+            -> Iterator[Tuple[Tuple[str, str], TypeVar('Base')]]:
+        """ Yield the (sort key, object) pairs of the class sorted by
+        created_at then id, starting after the given sort key
+        Objects are read ORDER_CHUNK at a time, so objects saved or
+        removed while iterating never make it skip or repeat one
+        """
+        cls.refresh()
+        order = cls._order()
+        while True:
+            with STORAGE_LOCK:
+                pos = 0 if after is None else \
+                    cls._order_position(order, after)
+                chunk = [(cls._order_key(obj_id), obj_id)
+                         for obj_id in order[pos:pos + cls.ORDER_CHUNK]]
+            if not chunk:
+                return
+            for key, obj_id in chunk:
+                obj = cls._materialize(obj_id)
+                if obj is not None:
+                    yield key, obj
+            after = chunk[-1][0]
+
     @classmethod
     def get(cls, id: str) -> TypeVar('Base'):
         """ Return one object by ID
         """
-        s_class = cls.__name__
-        return DATA[s_class].get(id)
+        cls.refresh()
+        return cls._materialize(id)
 
     @classmethod
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
+        Attributes listed in INDEXED_ATTRIBUTES are looked up in their
+        index, as of the last save(), instead of scanning every object
         """
         s_class = cls.__name__
+        cls.refresh()
         def _search(obj):
             if len(attributes) == 0:
                 return True
@@ -133,5 +930,16 @@ class Base():
                 if (getattr(obj, k) != v):
                     return False
             return True
-        
-        return list(filter(_search, DATA[s_class].values()))
+
+        candidates = DATA[s_class].keys()
+        indexes = cls._indexes() if attributes else {}
+        for k, v in attributes.items():
+            index = indexes.get(k)
+            if index is None:
+                continue
+            try:
+                candidates = index.get(v, {}).keys()
+            except TypeError:
+                continue
+            break
+        return list(filter(_search, map(cls._materialize, list(candidates))))
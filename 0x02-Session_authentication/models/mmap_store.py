@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+""" Memory-mapped record store module
+"""
+from collections.abc import MutableMapping
+from typing import Iterator, List, Tuple
+import mmap
+import os
+import struct
+import uuid
+import zlib
+
+from models.serializer import StructSerializer
+
+
+class MmapStore(MutableMapping):
+    """ Objects of a class kept in memory-mapped files instead of a dict
+
+    .db_<Class>.rec is an append-only log of entries: an op byte, "U" for
+    an upsert followed by a struct serializer record, or "D" for a delete
+    followed by the id. .db_<Class>.idx is an open-addressing hash table
+    of id -> entry offset slots. Both files are mapped, so every process
+    using them shares the page cache, and records are only decoded when
+    an object is read. The index is rebuilt from the log when missing or
+    when its generation does not match the log one.
+
+    With the SHARED_STORAGE of the class set, writes hold its exclusive
+    file lock, and the index header counts changes like a seqlock: odd
+    while a write is in progress, so lock-free reads retry when a write
+    overlapped them. An index replaced by _grow() or compact() gets its
+    magic cleared, so the other processes mapping it reopen the files.
+    """
+
+    DATA_MAGIC = b"BRS\x01"
+    DATA_HEADER = struct.Struct("<4s16s")
+    INDEX_MAGIC = b"BIX\x01"
+    INDEX_HEADER = struct.Struct("<4s16sqqqq")
+    CHANGES = struct.Struct("<q")
+    SLOT = struct.Struct("<48sq")
+    ID_SIZE = struct.Struct("<H")
+    EMPTY = 0
+    DELETED = -1
+    MIN_CAPACITY = 1024
+    UPSERT = b"U"
+    DELETE = b"D"
+
+    def __init__(self, cls):
+        """ Open, or create, the store files of a Base subclass
+        """
+        self.cls = cls
+        self.data_path = ".db_{}.rec".format(cls.__name__)
+        self.index_path = ".db_{}.idx".format(cls.__name__)
+        self.serializer = StructSerializer()
+        self.shared = cls.SHARED_STORAGE
+        with cls._file_lock():
+            self._open()
+        self.seen = len(self._data_map)
+        self.seen_generation = self.generation
+        self.seen_changes = self._changes()
+
+    def _open(self):
+        """ Map the log and the index, rebuilding a stale index
+        """
+        if not os.path.exists(self.data_path):
+            tmp_path = "{}.{}.tmp".format(self.data_path, os.getpid())
+            with open(tmp_path, "wb") as f:
+                f.write(self.DATA_HEADER.pack(self.DATA_MAGIC,
+                                              uuid.uuid4().bytes))
+            os.replace(tmp_path, self.data_path)
+        self.data_file = open(self.data_path, "r+b")
+        self.data_file.seek(0, os.SEEK_END)
+        self._data_map = mmap.mmap(self.data_file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        magic, self.generation = self.DATA_HEADER.unpack_from(self._data_map)
+        if magic != self.DATA_MAGIC:
+            raise ValueError("{} is not a record store".format(
+                self.data_path))
+        if not self._index_matches():
+            self._rebuild_index()
+        self._index_file = open(self.index_path, "r+b")
+        self._index_map = mmap.mmap(self._index_file.fileno(), 0)
+
+    def _index_matches(self) -> bool:
+        """ Return True if the index file belongs to the current log
+        """
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path, "rb") as f:
+            header = f.read(self.INDEX_HEADER.size)
+        if len(header) < self.INDEX_HEADER.size:
+            return False
+        magic, generation = self.INDEX_HEADER.unpack(header)[:2]
+        return magic == self.INDEX_MAGIC and generation == self.generation
+
+    def close(self):
+        """ Unmap and close both files
+        """
+        self._index_map.close()
+        self._index_file.close()
+        self._data_map.close()
+        self.data_file.close()
+
+    def flush(self):
+        """ Write buffered log entries and index pages to the files
+        """
+        self.data_file.flush()
+        self._index_map.flush()
+
+    def fileno(self) -> int:
+        """ Return the file descriptor of the log, to fsync it
+        """
+        return self.data_file.fileno()
+
+    def _header(self) -> Tuple[int, int, int]:
+        """ Return the capacity, live count and used slots of the index
+        """
+        return self.INDEX_HEADER.unpack_from(self._index_map)[2:5]
+
+    def _changes(self) -> int:
+        """ Return the change counter of the index
+        """
+        return self.CHANGES.unpack_from(self._index_map,
+                                        self.INDEX_HEADER.size - 8)[0]
+
+    def _bump(self):
+        """ Increment the change counter of the index
+        """
+        self.CHANGES.pack_into(self._index_map, self.INDEX_HEADER.size - 8,
+                               self._changes() + 1)
+
+    def _moved(self) -> bool:
+        """ Return True if another process replaced the index
+        """
+        return self._index_map[:4] != self.INDEX_MAGIC
+
+    def _retire(self):
+        """ Clear the magic of the mapped index before replacing it
+        """
+        self._index_map[:4] = b"\0\0\0\0"
+        self._index_map.flush()
+
+    def _reopen(self):
+        """ Map the files again after another process replaced them
+        """
+        self.close()
+        self._open()
+
+    def _read(self, read):
+        """ Return read(), run without a lock unless a write overlapped it
+        """
+        if not self.shared:
+            return read()
+        for attempt in range(3):
+            if self._moved():
+                with self.cls._file_lock():
+                    if self._moved():
+                        self._reopen()
+            before = self._changes()
+            if before % 2:
+                continue
+            try:
+                result = read()
+            except (ValueError, struct.error, IndexError, UnicodeError):
+                if self._changes() == before and not self._moved():
+                    raise
+                continue
+            if self._changes() == before and not self._moved():
+                return result
+        with self.cls._file_lock(exclusive=False):
+            return read()
+
+    def _find(self, key: bytes, index_map=None) -> Tuple[int, int]:
+        """ Return the slot of a padded id and its entry offset, or the
+        slot to insert it at and None
+        """
+        index_map = self._index_map if index_map is None else index_map
+        capacity = self.INDEX_HEADER.unpack_from(index_map)[2]
+        slot = zlib.crc32(key) % capacity
+        free_slot = None
+        while True:
+            pos = self.INDEX_HEADER.size + slot * self.SLOT.size
+            slot_key, offset = self.SLOT.unpack_from(index_map, pos)
+            if offset == self.EMPTY:
+                return (slot if free_slot is None else free_slot), None
+            if offset == self.DELETED:
+                if free_slot is None:
+                    free_slot = slot
+            elif slot_key == key:
+                return slot, offset
+            slot = (slot + 1) % capacity
+
+    def _key(self, obj_id: str) -> bytes:
+        """ Return an id as the padded bytes stored in index slots
+        """
+        key = obj_id.encode("utf-8")
+        if len(key) > self.SLOT.size - 8:
+            raise ValueError("Id too long for the record store: {}".format(
+                obj_id))
+        return key.ljust(self.SLOT.size - 8, b"\0")
+
+    def _set_slot(self, index_map, slot: int, key: bytes, offset: int):
+        """ Write an index slot
+        """
+        pos = self.INDEX_HEADER.size + slot * self.SLOT.size
+        self.SLOT.pack_into(index_map, pos, key, offset)
+
+    def _put(self, index_map, key: bytes, offset: int):
+        """ Point an id to an entry, or remove it when offset is DELETED
+        """
+        slot, old_offset = self._find(key, index_map)
+        header = list(self.INDEX_HEADER.unpack_from(index_map))
+        capacity, count, used = header[2:5]
+        if offset == self.DELETED:
+            if old_offset is None:
+                return
+            count -= 1
+        elif old_offset is None:
+            count += 1
+            pos = self.INDEX_HEADER.size + slot * self.SLOT.size
+            if self.SLOT.unpack_from(index_map, pos)[1] == self.EMPTY:
+                used += 1
+        self._set_slot(index_map, slot, key, offset)
+        header[3:5] = count, used
+        self.INDEX_HEADER.pack_into(index_map, 0, *header)
+
+    def _entries(self, start: int = None) \
+            -> Iterator[Tuple[bytes, bytes, int, int]]:
+        """ Yield the (op, id, offset, end offset) of every entry of the
+        log, from the start offset on
+        """
+        self._remap()
+        data_map = self._data_map
+        pos = self.DATA_HEADER.size if start is None else start
+        while pos < len(data_map):
+            op = data_map[pos:pos + 1]
+            if op == self.UPSERT:
+                size = self.serializer.HEADER.unpack_from(data_map,
+                                                          pos + 1)[0]
+                end = pos + 1 + self.serializer.HEADER.size + size
+                id_pos = pos + 1 + self.serializer.HEADER.size
+            elif op == self.DELETE:
+                size = self.ID_SIZE.unpack_from(data_map, pos + 1)[0]
+                end = pos + 1 + self.ID_SIZE.size + size
+                id_pos = pos + 1
+            else:
+                raise ValueError("Corrupted record store at {}".format(pos))
+            if end > len(data_map):
+                return
+            id_size = self.ID_SIZE.unpack_from(data_map, id_pos)[0]
+            id_pos += self.ID_SIZE.size
+            yield op, bytes(data_map[id_pos:id_pos + id_size]), pos, end
+            pos = end
+
+    def _new_index(self, path: str, capacity: int):
+        """ Create an empty index file of the given capacity
+        """
+        with open(path, "wb") as f:
+            f.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, self.generation,
+                                           capacity, 0, 0, 0))
+            f.truncate(self.INDEX_HEADER.size + capacity * self.SLOT.size)
+
+    def _build_index(self, capacity: int, entries) -> str:
+        """ Write a new index of the given entries to a temporary file and
+        return its path
+        """
+        tmp_path = "{}.{}.tmp".format(self.index_path, os.getpid())
+        self._new_index(tmp_path, capacity)
+        with open(tmp_path, "r+b") as f:
+            index_map = mmap.mmap(f.fileno(), 0)
+            for key, offset in entries:
+                self._put(index_map, key, offset)
+            index_map.flush()
+            index_map.close()
+        return tmp_path
+
+    def _rebuild_index(self):
+        """ Rebuild the index by replaying the log
+        """
+        def entries():
+            """ Yield (key, offset) updates of the log """
+            for op, obj_id, offset, end in self._entries():
+                key = obj_id.ljust(self.SLOT.size - 8, b"\0")
+                yield key, offset if op == self.UPSERT else self.DELETED
+
+        live = {}
+        for key, offset in entries():
+            live[key] = offset
+        count = sum(offset != self.DELETED for offset in live.values())
+        capacity = self.MIN_CAPACITY
+        while count * 4 > capacity:
+            capacity *= 2
+        tmp_path = self._build_index(capacity, (
+            (key, offset) for key, offset in live.items()
+            if offset != self.DELETED))
+        os.replace(tmp_path, self.index_path)
+
+    def _grow(self):
+        """ Move the live slots to a new index without deleted slots,
+        doubling its capacity until it is at most a quarter full
+        """
+        capacity, count = self._header()[:2]
+        while count * 4 > capacity:
+            capacity *= 2
+        tmp_path = self._build_index(capacity, self._slots())
+        self._retire()
+        self._index_map.close()
+        self._index_file.close()
+        os.replace(tmp_path, self.index_path)
+        self._index_file = open(self.index_path, "r+b")
+        self._index_map = mmap.mmap(self._index_file.fileno(), 0)
+
+    def _slots(self) -> Iterator[Tuple[bytes, int]]:
+        """ Yield the (padded id, offset) of every live index slot
+        """
+        capacity = self._header()[0]
+        for slot in range(capacity):
+            pos = self.INDEX_HEADER.size + slot * self.SLOT.size
+            key, offset = self.SLOT.unpack_from(self._index_map, pos)
+            if offset > 0:
+                yield key, offset
+
+    def _remap(self):
+        """ Map the log again to see the entries appended since
+        """
+        self.data_file.flush()
+        if os.fstat(self.data_file.fileno()).st_size > len(self._data_map):
+            self._data_map.close()
+            self._data_map = mmap.mmap(self.data_file.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+
+    def _append(self, entry: bytes) -> int:
+        """ Append an entry to the log and return its offset
+        """
+        offset = self.data_file.seek(0, os.SEEK_END)
+        self.data_file.write(entry)
+        self.data_file.flush()
+        if self.seen == offset and self.seen_generation == self.generation:
+            self.seen = offset + len(entry)
+        return offset
+
+    def _write(self, key: bytes, entry: bytes, deleted: bool):
+        """ Append an upsert or delete entry and point the id to it, under
+        the exclusive file lock of the class
+        """
+        with self.cls._file_lock():
+            if self._moved():
+                self._reopen()
+            caught_up = self.seen_changes == self._changes()
+            offset = self._append(entry)
+            self._bump()
+            self._put(self._index_map, key,
+                      self.DELETED if deleted else offset)
+            self._bump()
+            if caught_up:
+                self.seen_changes = self._changes()
+            capacity, count, used = self._header()
+            if used * 2 > capacity:
+                self._grow()
+                if caught_up:
+                    self.seen_changes = self._changes()
+
+    def changed(self) -> bool:
+        """ Return True if the files changed since the last poll(), from
+        the index header only
+        """
+        return self._moved() or self._changes() != self.seen_changes
+
+    def poll(self) -> Tuple[bool, List[str]]:
+        """ Return whether the log was replaced since the last poll, in
+        which case offsets seen before are meaningless, and the ids of
+        the entries appended since then
+        """
+        if self._moved():
+            with self.cls._file_lock():
+                if self._moved():
+                    self._reopen()
+        with self.cls._file_lock(exclusive=False):
+            self.seen_changes = self._changes()
+            if self.generation != self.seen_generation:
+                self._remap()
+                self.seen = len(self._data_map)
+                self.seen_generation = self.generation
+                return True, []
+            ids = []
+            for op, obj_id, offset, end in self._entries(self.seen):
+                ids.append(obj_id.decode("utf-8"))
+                self.seen = end
+        return False, ids
+
+    def read(self, offset: int) -> dict:
+        """ Decode the object of the upsert entry at offset
+        """
+        if offset + 1 + self.serializer.HEADER.size > len(self._data_map):
+            self._remap()
+        size = self.serializer.HEADER.unpack_from(self._data_map,
+                                                  offset + 1)[0]
+        if offset + 1 + self.serializer.HEADER.size + size > \
+                len(self._data_map):
+            self._remap()
+        return self.serializer.unpack_record(self._data_map, offset + 1)[0]
+
+    def __getitem__(self, obj_id: str):
+        key = self._key(obj_id)
+
+        def read():
+            """ Decode the record of the id, if any """
+            offset = self._find(key)[1]
+            return None if offset is None else self.read(offset)
+
+        obj = self._read(read)
+        if obj is None:
+            raise KeyError(obj_id)
+        return self.cls(**obj)
+
+    def __contains__(self, obj_id) -> bool:
+        if type(obj_id) is not str:
+            return False
+        key = self._key(obj_id)
+        return self._read(lambda: self._find(key)[1] is not None)
+
+    def __setitem__(self, obj_id: str, obj):
+        if type(obj) is not dict:
+            obj = obj.to_dict()
+        self._write(self._key(obj_id),
+                    self.UPSERT + self.serializer.pack_record(obj), False)
+
+    def __delitem__(self, obj_id: str):
+        key = self._key(obj_id)
+        if obj_id not in self:
+            raise KeyError(obj_id)
+        raw_id = obj_id.encode("utf-8")
+        self._write(key, self.DELETE + self.ID_SIZE.pack(len(raw_id)) +
+                    raw_id, True)
+
+    def __len__(self) -> int:
+        return self._read(lambda: self._header()[1])
+
+    def __iter__(self) -> Iterator[str]:
+        for key, offset in self._read(lambda: list(self._slots())):
+            yield key.rstrip(b"\0").decode("utf-8")
+
+    def compact(self):
+        """ Rewrite the log with only the live objects, under a new
+        generation, then rebuild the index for it
+        """
+        with self.cls._file_lock():
+            if self._moved():
+                self._reopen()
+            self._remap()
+            tmp_path = "{}.{}.tmp".format(self.data_path, os.getpid())
+            generation = uuid.uuid4().bytes
+            with open(tmp_path, "wb") as f:
+                f.write(self.DATA_HEADER.pack(self.DATA_MAGIC, generation))
+                for key, offset in self._slots():
+                    size = self.serializer.HEADER.unpack_from(
+                        self._data_map, offset + 1)[0]
+                    end = offset + 1 + self.serializer.HEADER.size + size
+                    f.write(self._data_map[offset:end])
+                f.flush()
+                os.fsync(f.fileno())
+            self._retire()
+            self.close()
+            os.replace(tmp_path, self.data_path)
+            self._open()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+""" Serializer module
+Snapshot formats of the file-backed models, detected from their content:
+  - json: the {id: object} JSON document
+  - struct: length-prefixed binary records with epoch timestamps
+Convert a snapshot with: python3 -m models.serializer SRC DST --format FMT
+"""
+from datetime import datetime, timedelta
+from typing import BinaryIO, Iterable, Iterator, Tuple
+import argparse
+import io
+import json
+import struct
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+EPOCH = datetime(1970, 1, 1)
+
+
+def iter_snapshot(f, chunk_size: int = 1 << 16) -> Iterator[Tuple[str, dict]]:
+    """ Yield the (id, JSON dictionary) pairs of a snapshot file one at a
+    time, reading it in chunks instead of parsing the whole document
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def skip(chars: str) -> str:
+        """ Skip whitespace, then return the next character if it is one
+        of chars, refilling the buffer as needed
+        """
+        nonlocal buf, pos, eof
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf):
+                char = buf[pos]
+                if char not in chars:
+                    raise ValueError("Unexpected {!r} at {}".format(char, pos))
+                pos += 1
+                return char
+            if eof:
+                raise ValueError("Unexpected end of snapshot")
+            chunk = f.read(chunk_size)
+            eof = chunk == ""
+            buf, pos = buf[pos:] + chunk, 0
+
+    def value():
+        """ Decode the next JSON value, refilling the buffer as needed
+        """
+        nonlocal buf, pos, eof
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            try:
+                result, end = decoder.raw_decode(buf, pos)
+                if end < len(buf) or eof:
+                    pos = end
+                    return result
+            except ValueError:
+                if eof:
+                    raise
+            chunk = f.read(chunk_size)
+            eof = chunk == ""
+            buf, pos = buf[pos:] + chunk, 0
+
+    skip("{")
+    while True:
+        separator = skip('}",')
+        if separator == "}":
+            return
+        if separator == '"':
+            pos -= 1
+        obj_id = value()
+        skip(":")
+        yield obj_id, value()
+
+
+def to_datetime(value) -> datetime:
+    """ Return a timestamp as a datetime, parsing TIMESTAMP_FORMAT strings
+    """
+    if value is None or type(value) is datetime:
+        return value
+    return datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+class JsonSerializer():
+    """ Snapshot stored as a single {id: object} JSON document
+    """
+
+    name = "json"
+    extension = "json"
+    NATIVE_DATETIMES = False
+
+    @staticmethod
+    def sniff(head: bytes) -> bool:
+        """ Return True if the file starts like a JSON object
+        """
+        return head.lstrip()[:1] == b"{"
+
+    @staticmethod
+    def _default(value):
+        """ Encode the datetimes of objects loaded from other formats
+        """
+        if type(value) is datetime:
+            return value.strftime(TIMESTAMP_FORMAT)
+        raise TypeError("{!r} is not JSON serializable".format(value))
+
+    def dump(self, objs: Iterable[dict], f: BinaryIO):
+        """ Write objects to a binary file
+        """
+        out = io.TextIOWrapper(f, encoding="utf-8", write_through=True)
+        out.write("{")
+        for i, obj in enumerate(objs):
+            out.write("{}{}: {}".format(", " if i else "",
+                                        json.dumps(obj["id"]),
+                                        json.dumps(obj,
+                                                   default=self._default)))
+        out.write("}")
+        out.detach()
+
+    def load(self, f: BinaryIO) -> Iterator[dict]:
+        """ Yield the objects of a binary file one at a time
+        """
+        text = io.TextIOWrapper(f, encoding="utf-8")
+        try:
+            for obj_id, obj in iter_snapshot(text):
+                yield obj
+        finally:
+            text.detach()
+
+
+class StructSerializer():
+    """ Snapshot stored as length-prefixed binary records
+    Each record holds the created_at and updated_at epochs in
+    microseconds, the id, then every other field as a typed key/value
+    pair, so loading never parses timestamp strings
+    """
+
+    name = "struct"
+    extension = "bin"
+    NATIVE_DATETIMES = True
+    MAGIC = b"BDB\x01"
+    HEADER = struct.Struct("<Iqq")
+    NO_TIMESTAMP = -(1 << 63)
+    NONE, STR, JSON = 0, 1, 2
+
+    @classmethod
+    def sniff(cls, head: bytes) -> bool:
+        """ Return True if the file starts with the struct magic bytes
+        """
+        return head.startswith(cls.MAGIC)
+
+    @classmethod
+    def _epoch(cls, value) -> int:
+        """ Return a timestamp as microseconds since the epoch
+        """
+        value = to_datetime(value)
+        if value is None:
+            return cls.NO_TIMESTAMP
+        return (value - EPOCH) // timedelta(microseconds=1)
+
+    def _pack(self, obj: dict) -> bytes:
+        """ Return the body of the record of an object
+        """
+        parts = []
+        obj_id = obj["id"].encode("utf-8")
+        parts.append(struct.pack("<H", len(obj_id)))
+        parts.append(obj_id)
+        for key, value in obj.items():
+            if key == "id" or key in TIMESTAMP_FIELDS:
+                continue
+            key = key.encode("utf-8")
+            if value is None:
+                tag, data = self.NONE, b""
+            elif type(value) is str:
+                tag, data = self.STR, value.encode("utf-8")
+            else:
+                tag, data = self.JSON, json.dumps(value).encode("utf-8")
+            parts.append(struct.pack("<BBI", len(key), tag, len(data)))
+            parts.append(key)
+            parts.append(data)
+        return b"".join(parts)
+
+    def pack_record(self, obj: dict) -> bytes:
+        """ Return the record of an object, header included
+        """
+        body = self._pack(obj)
+        return self.HEADER.pack(len(body),
+                                self._epoch(obj.get("created_at")),
+                                self._epoch(obj.get("updated_at"))) + body
+
+    def dump(self, objs: Iterable[dict], f: BinaryIO):
+        """ Write objects to a binary file
+        """
+        f.write(self.MAGIC)
+        for obj in objs:
+            f.write(self.pack_record(obj))
+
+    def _unpack(self, body: bytes) -> dict:
+        """ Return the fields, except timestamps, of a record body
+        """
+        size, = struct.unpack_from("<H", body)
+        pos = 2 + size
+        obj = {"id": body[2:pos].decode("utf-8")}
+        while pos < len(body):
+            key_size, tag, size = struct.unpack_from("<BBI", body, pos)
+            pos += 6
+            key = body[pos:pos + key_size].decode("utf-8")
+            pos += key_size
+            data = body[pos:pos + size]
+            pos += size
+            if tag == self.NONE:
+                obj[key] = None
+            elif tag == self.STR:
+                obj[key] = data.decode("utf-8")
+            else:
+                obj[key] = json.loads(data)
+        return obj
+
+    def unpack_record(self, buffer, pos: int = 0) -> Tuple[dict, int]:
+        """ Return the object of the record at pos in a buffer, and the
+        position following the record
+        """
+        size, created_at, updated_at = self.HEADER.unpack_from(buffer, pos)
+        pos += self.HEADER.size
+        obj = self._unpack(buffer[pos:pos + size])
+        for key, epoch in (("created_at", created_at),
+                           ("updated_at", updated_at)):
+            if epoch != self.NO_TIMESTAMP:
+                obj[key] = EPOCH + timedelta(microseconds=epoch)
+        return obj, pos + size
+
+    def load(self, f: BinaryIO) -> Iterator[dict]:
+        """ Yield the objects of a binary file one at a time
+        """
+        if f.read(len(self.MAGIC)) != self.MAGIC:
+            raise ValueError("Not a struct snapshot")
+        header_size = self.HEADER.size
+        while True:
+            header = f.read(header_size)
+            if not header:
+                return
+            if len(header) < header_size:
+                raise ValueError("Truncated struct snapshot")
+            size, = struct.unpack_from("<I", header)
+            yield self.unpack_record(header + f.read(size))[0]
+
+
+SERIALIZERS = {
+    JsonSerializer.name: JsonSerializer(),
+    StructSerializer.name: StructSerializer(),
+}
+
+
+def detect(f: BinaryIO):
+    """ Return the serializer of a snapshot from its first bytes, leaving
+    the file position unchanged
+    """
+    position = f.tell()
+    head = f.read(16)
+    f.seek(position)
+    for serializer in SERIALIZERS.values():
+        if serializer.sniff(head):
+            return serializer
+    raise ValueError("Unknown snapshot format")
+
+
+def convert(src: str, dst: str, format: str):
+    """ Rewrite the snapshot src as dst in the given format
+    """
+    with open(src, "rb") as f_in, open(dst, "wb") as f_out:
+        SERIALIZERS[format].dump(detect(f_in).load(f_in), f_out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a snapshot")
+    parser.add_argument("src", help="snapshot to read, in any format")
+    parser.add_argument("dst", help="snapshot to write")
+    parser.add_argument("--format", choices=sorted(SERIALIZERS),
+                        default=StructSerializer.name,
+                        help="format of the written snapshot")
+    args = parser.parse_args()
+    convert(args.src, args.dst, args.format)
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+""" UserSession module
+"""
+from models.base import Base
+
+
+class UserSession(Base):
+    """ UserSession class
+    The ID of a session is its session_id. Sessions are shared by the
+    workers through the journal, and written behind: logins and logouts
+    are appended in groups of GROUP_COMMIT_COUNT, or GROUP_COMMIT_INTERVAL
+    seconds after the first
+    """
+
+    __slots__ = ("user_id", "session_id")
+    STORAGE_MODE = "journal"
+    SHARED_STORAGE = True
+    GROUP_COMMIT_COUNT = 100
+    GROUP_COMMIT_INTERVAL = 0.05
+
+    def __init__(self, *args: list, **kwargs: dict):
+        """ Initialize a UserSession instance
+        """
+        if kwargs.get('id') is None and kwargs.get('session_id') is not None:
+            kwargs['id'] = kwargs['session_id']
+        super().__init__(*args, **kwargs)
+        self.user_id = kwargs.get('user_id')
+        self.session_id = self.id
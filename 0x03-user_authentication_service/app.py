@@ -6,7 +6,7 @@ import bcrypt
 from uuid import uuid4
 from sqlalchemy.orm.exc import NoResultFound
 from flask import Flask, jsonify, request
-from auth import Auth
+from auth import Auth, VerifierSaturated
 
 AUTH = Auth()
 app = Flask(__name__)
@@ -51,7 +51,12 @@ def login():
     email = request.form.get("email")
     password = request.form.get("password")
 
-    if AUTH.valid_login(email, password):
+    try:
+        valid = AUTH.valid_login(email, password)
+    except VerifierSaturated:
+        return jsonify({"message": "Service Unavailable"}), 503
+
+    if valid:
         session_id = _generate_uuid()
         response = jsonify({"email": email, "message": "logged in"})
         response.set_cookie("session_id", session_id)
@@ -3,6 +3,8 @@
 Definition of _hash_password function
 """
 import bcrypt
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from uuid import uuid4
 from sqlalchemy.orm.exc import NoResultFound
 from typing import (
@@ -33,12 +35,78 @@ def _generate_uuid() -> str:
     return str(uuid4())
 
 
+class VerifierSaturated(Exception):
+    """Raised when too many password checks are already pending
+    """
+
+
+class PasswordVerifier:
+    """PasswordVerifier class to check passwords against their bcrypt
+    hashes on a pool of threads, max_pending checks at most.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 32) -> None:
+        """
+        Args:
+            workers (int): number of verification threads
+            max_pending (int): maximum number of queued and running checks
+        """
+        self._executor = ThreadPoolExecutor(workers,
+                                            thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, hashed_password: bytes, password: str) -> Future:
+        """
+        Schedule a password check and return its future
+        Args:
+            hashed_password (bytes): stored bcrypt hash
+            password (str): password to check
+        Return:
+            future resolving to True if the password matches, else False
+            raise VerifierSaturated if max_pending checks are pending
+        """
+        if not self._slots.acquire(blocking=False):
+            raise VerifierSaturated("Too many pending password checks")
+        try:
+            future = self._executor.submit(bcrypt.checkpw,
+                                           password.encode("utf-8"),
+                                           hashed_password)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def verify(self, hashed_password: bytes, password: str,
+               timeout: float = None) -> bool:
+        """
+        Check a password on the pool and wait for the result
+        Args:
+            hashed_password (bytes): stored bcrypt hash
+            password (str): password to check
+            timeout (float): maximum number of seconds to wait, None for
+                no limit
+        Return:
+            True if the password matches, else False
+            raise TimeoutError if the check takes longer than timeout
+        """
+        return self.submit(hashed_password, password).result(timeout)
+
+    def shutdown(self) -> None:
+        """
+        Wait for the pending checks and stop the threads
+        """
+        self._executor.shutdown(wait=True)
+
+
 class Auth:
     """Auth class to interact with the authentication database.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, verify_workers: int = 4,
+                 max_pending_logins: int = 32) -> None:
         self._db = DB()
+        self._verifier = PasswordVerifier(verify_workers, max_pending_logins)
 
     def register_user(self, email: str, password: str) -> User:
         """
@@ -67,15 +135,14 @@ class Auth:
             password (str): user's password
         Return:
             True if credentials are correct, else False
+            raise VerifierSaturated if too many logins are being checked
         """
         try:
             user = self._db.find_user_by(email=email)
         except NoResultFound:
             return False
 
-        user_password = user.hashed_password
-        passwd = password.encode("utf-8")
-        return bcrypt.checkpw(passwd, user_password)
+        return self._verifier.verify(user.hashed_password, password)
 
     def create_session(self, email: str) -> Union[None, str]:
         """